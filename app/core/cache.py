@@ -0,0 +1,145 @@
+"""
+Redis-backed caching helpers
+Caching is a no-op when REDIS_URL is not configured or Redis is unreachable
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+import orjson
+
+from .config import settings
+from .responses import ORJSON_OPTIONS
+
+try:
+    import redis
+except ImportError:  # redis is optional
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Cache key schema, shared between writers and readers:
+#   user_stats_v1                                     admin user stats (30s)
+#   instructor_name:{user_id}                         instructor display name (1h)
+#   search:{lat}:{lng}:{radius}:{category}:{limit}    nearby locations, coords rounded to 4dp (120s)
+#   ratelimit:{key}                                   sliding-window sorted set (window length)
+#   users:count:ver                                   user count generation, bumped on user writes
+#   users:count:v{ver}:{filter hash}                  filtered user count (45s)
+USER_STATS_CACHE_KEY = "user_stats_v1"
+INSTRUCTOR_NAME_CACHE_PREFIX = "instructor_name:"
+NEARBY_SEARCH_CACHE_PREFIX = "search:"
+RATE_LIMIT_CACHE_PREFIX = "ratelimit:"
+USER_COUNT_CACHE_PREFIX = "users:count:"
+USER_COUNT_VERSION_KEY = "users:count:ver"
+
+class CacheManager:
+    """Manages a lazily created Redis client for query-result caching"""
+
+    def __init__(self):
+        self.client = None
+        self._disabled = redis is None or not settings.REDIS_URL
+
+    def get_client(self):
+        """Get Redis client, creating it on first use"""
+        if self._disabled:
+            return None
+        if self.client is None:
+            self.client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        return self.client
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached JSON value, or None on miss or error"""
+        client = self.get_client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache get failed for {key}: {e}")
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """Cache a JSON-serializable value for ttl seconds"""
+        client = self.get_client()
+        if client is None:
+            return
+        try:
+            client.set(key, orjson.dumps(value, default=str, option=ORJSON_OPTIONS), ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Cache set failed for {key}: {e}")
+
+    def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several cached JSON values in one round-trip, None for misses"""
+        client = self.get_client()
+        if client is None or not keys:
+            return [None] * len(keys)
+        try:
+            raws = client.mget(keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache mget failed: {e}")
+            return [None] * len(keys)
+        return [orjson.loads(raw) if raw is not None else None for raw in raws]
+
+    def set_many(self, mapping: Dict[str, Any], ttl: int) -> None:
+        """Cache several JSON-serializable values for ttl seconds"""
+        client = self.get_client()
+        if client is None or not mapping:
+            return
+        try:
+            pipe = client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, orjson.dumps(value, default=str, option=ORJSON_OPTIONS), ex=ttl)
+            pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Cache mset failed: {e}")
+
+    def incr(self, key: str) -> None:
+        """Atomically increment an integer counter"""
+        client = self.get_client()
+        if client is None:
+            return
+        try:
+            client.incr(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache incr failed for {key}: {e}")
+
+    def delete(self, *keys: str) -> None:
+        """Invalidate cached keys"""
+        client = self.get_client()
+        if client is None or not keys:
+            return
+        try:
+            client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache delete failed for {keys}: {e}")
+
+# Global cache manager instance
+cache_manager = CacheManager()
+
+def cache_get(key: str) -> Optional[Any]:
+    """Get a cached value"""
+    return cache_manager.get(key)
+
+def cache_set(key: str, value: Any, ttl: int) -> None:
+    """Cache a value with a TTL in seconds"""
+    cache_manager.set(key, value, ttl)
+
+def cache_get_many(keys: List[str]) -> List[Optional[Any]]:
+    """Get several cached values, aligned with keys"""
+    return cache_manager.get_many(keys)
+
+def cache_set_many(mapping: Dict[str, Any], ttl: int) -> None:
+    """Cache several values with a TTL in seconds"""
+    cache_manager.set_many(mapping, ttl)
+
+def cache_incr(key: str) -> None:
+    """Increment a counter, e.g. to retire a generation of cached keys"""
+    cache_manager.incr(key)
+
+def cache_delete(*keys: str) -> None:
+    """Invalidate cached keys"""
+    cache_manager.delete(*keys)
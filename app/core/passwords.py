@@ -0,0 +1,22 @@
+"""
+Password hashing helpers
+Hashing still runs on the calling thread; a semaphore caps how many hashes run at once per process
+"""
+import threading
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Same scheme the auth router registers and migrates users to
+PASSWORD_HASH_METHOD = "scrypt"
+
+_HASH_SLOTS = threading.BoundedSemaphore(4)
+
+def hash_password_bounded(password: str) -> str:
+    """Hash a password, waiting for a free hashing slot"""
+    with _HASH_SLOTS:
+        return generate_password_hash(password, method=PASSWORD_HASH_METHOD)
+
+def verify_password_bounded(plain_password: str, hashed_password: str) -> bool:
+    """Check a password against its hash, waiting for a free hashing slot"""
+    with _HASH_SLOTS:
+        return check_password_hash(hashed_password, plain_password)
@@ -0,0 +1,80 @@
+"""
+JSON response helpers backed by orjson
+"""
+from typing import Any, Dict, Iterable, Optional
+
+import orjson
+from flask import Response, stream_with_context
+from flask.json.provider import JSONProvider
+
+# Naive datetimes stored by pymongo are UTC, so tag them as such on output;
+# non-str dict keys (e.g. numeric levels) are stringified as the stdlib json does
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+def ojson(payload, status: int = 200) -> Response:
+    """Serialize payload with orjson into a Flask JSON response
+
+    ObjectIds and any other non-native types fall back to ``str`` so
+    Mongo documents can be returned without per-field conversion.
+    """
+    return Response(
+        orjson.dumps(payload, default=str, option=ORJSON_OPTIONS),
+        status=status,
+        mimetype="application/json"
+    )
+
+def ojson_stream(
+    items: Iterable[Any],
+    key: str,
+    count_key: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+    status: int = 200
+) -> Response:
+    """Stream ``{key: [...items], count_key: n, **extra}`` as items are read
+
+    Each item (typically a live pymongo cursor) is encoded and sent as it
+    arrives, so the full result list is never held in memory.
+    """
+    def generate():
+        yield b"{" + orjson.dumps(key) + b":["
+        count = 0
+        for item in items:
+            if count:
+                yield b","
+            yield orjson.dumps(item, default=str, option=ORJSON_OPTIONS)
+            count += 1
+        
+        tail = dict(extra or {})
+        if count_key:
+            tail[count_key] = count
+        yield b"]" + (b"," + orjson.dumps(tail, default=str, option=ORJSON_OPTIONS)[1:] if tail else b"}")
+    
+    return Response(
+        stream_with_context(generate()),
+        status=status,
+        mimetype="application/json"
+    )
+
+def ndjson_stream(items: Iterable[Any], status: int = 200) -> Response:
+    """Stream items as newline-delimited JSON, one encoded item per line"""
+    def generate():
+        for item in items:
+            yield orjson.dumps(item, default=str, option=ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+    
+    return Response(
+        stream_with_context(generate()),
+        status=status,
+        mimetype="application/x-ndjson"
+    )
+
+class ORJSONProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, used by jsonify and request.get_json"""
+
+    # Includes OPT_NON_STR_KEYS, so jsonify keeps accepting int and None keys
+    option = ORJSON_OPTIONS
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=str, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
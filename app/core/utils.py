@@ -12,12 +12,23 @@ from typing import Any, Dict, List, Optional, Union, Tuple
 from bson import ObjectId
 import logging
 import math
+from math import sin, cos, asin, sqrt
 from functools import wraps
+from collections import OrderedDict, deque
 import time
 
+from .cache import cache_manager, RATE_LIMIT_CACHE_PREFIX
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Haversine constants
+EARTH_RADIUS_KM = 6371.0
+EARTH_DIAMETER_KM = 2 * EARTH_RADIUS_KM
+DEG_TO_RAD = math.pi / 180
+HALF_DEG_TO_RAD = DEG_TO_RAD / 2
+DEG_PER_KM = 1 / 111.32  # 1 degree latitude ≈ 111.32 km
+
 class DataUtils:
     """Utility class for data manipulation and validation"""
     
@@ -125,6 +136,14 @@ class DateTimeUtils:
         except ValueError:
             return None
     
+    @staticmethod
+    def parse_date(date_string: str) -> datetime:
+        """Parse a YYYY-MM-DD string to a midnight datetime, raising ValueError if malformed"""
+        # fromisoformat is C-implemented; the shape check keeps it to plain dates
+        if len(date_string) != 10 or date_string[4] != '-' or date_string[7] != '-':
+            raise ValueError(f"Invalid date: {date_string!r}")
+        return datetime.fromisoformat(date_string)
+    
     @staticmethod
     def is_expired(timestamp: datetime, expiry_minutes: int = 30) -> bool:
         """Check if a timestamp has expired"""
@@ -158,18 +177,13 @@ class LocationUtils:
     @staticmethod
     def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
         """Calculate distance between two points using Haversine formula"""
-        R = 6371  # Earth's radius in kilometers
+        sin_half_dlat = sin((lat2 - lat1) * HALF_DEG_TO_RAD)
+        sin_half_dlon = sin((lon2 - lon1) * HALF_DEG_TO_RAD)
         
-        lat1_rad = math.radians(lat1)
-        lat2_rad = math.radians(lat2)
-        delta_lat = math.radians(lat2 - lat1)
-        delta_lon = math.radians(lon2 - lon1)
+        a = (sin_half_dlat * sin_half_dlat +
+             cos(lat1 * DEG_TO_RAD) * cos(lat2 * DEG_TO_RAD) * sin_half_dlon * sin_half_dlon)
         
-        a = (math.sin(delta_lat / 2) ** 2 + 
-             math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2)
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        
-        return R * c
+        return EARTH_DIAMETER_KM * asin(sqrt(min(a, 1.0)))
     
     @staticmethod
     def is_within_radius(lat1: float, lon1: float, lat2: float, lon2: float, radius_km: float) -> bool:
@@ -185,9 +199,9 @@ class LocationUtils:
     @staticmethod
     def get_bounding_box(center_lat: float, center_lon: float, radius_km: float) -> Dict[str, float]:
         """Get bounding box for a circular area"""
-        # Approximate bounding box (simplified)
-        lat_delta = radius_km / 111.32  # 1 degree latitude ≈ 111.32 km
-        lon_delta = radius_km / (111.32 * math.cos(math.radians(center_lat)))
+        # Approximate bounding box (simplified); longitude degrees shrink by cos(lat)
+        lat_delta = radius_km * DEG_PER_KM
+        lon_delta = lat_delta / max(cos(center_lat * DEG_TO_RAD), 1e-9)
         
         return {
             "min_lat": center_lat - lat_delta,
@@ -197,9 +211,35 @@ class LocationUtils:
         }
 
 class RateLimitUtils:
-    """Utility class for rate limiting operations"""
+    """Utility class for rate limiting operations
+
+    Uses a Redis sorted-set sliding window shared across workers when Redis
+    is configured, falling back to an in-process store otherwise.
+    """
     
-    _rate_limit_store: Dict[str, List[float]] = {}
+    # Local fallback store, LRU-bounded so distinct keys can't grow it without limit
+    _rate_limit_store: "OrderedDict[str, deque]" = OrderedDict()
+    _max_local_keys = 100_000
+    
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        """Namespaced Redis key for a rate limit key"""
+        return f"{RATE_LIMIT_CACHE_PREFIX}{key}"
+    
+    @staticmethod
+    def _prune_local(key: str, current_time: float, window_seconds: float) -> deque:
+        """Drop expired timestamps from the front of a key's window"""
+        store = RateLimitUtils._rate_limit_store
+        timestamps = store.get(key)
+        if timestamps is None:
+            timestamps = store[key] = deque()
+            if len(store) > RateLimitUtils._max_local_keys:
+                store.popitem(last=False)
+        else:
+            store.move_to_end(key)
+        while timestamps and current_time - timestamps[0] >= window_seconds:
+            timestamps.popleft()
+        return timestamps
     
     @staticmethod
     def check_rate_limit(key: str, max_requests: int, window_minutes: int) -> bool:
@@ -207,22 +247,35 @@ class RateLimitUtils:
         current_time = time.time()
         window_seconds = window_minutes * 60
         
-        # Initialize or clean old entries
-        if key not in RateLimitUtils._rate_limit_store:
-            RateLimitUtils._rate_limit_store[key] = []
+        client = cache_manager.get_client()
+        if client is not None:
+            try:
+                redis_key = RateLimitUtils._redis_key(key)
+                member = f"{current_time}:{secrets.token_hex(4)}"
+                pipe = client.pipeline()
+                pipe.zremrangebyscore(redis_key, 0, current_time - window_seconds)
+                pipe.zcard(redis_key)
+                pipe.zadd(redis_key, {member: current_time})
+                pipe.expire(redis_key, window_seconds)
+                _, count, _, _ = pipe.execute()
+                
+                if count >= max_requests:
+                    # Rejected requests don't count against the window
+                    client.zrem(redis_key, member)
+                    return False
+                return True
+            except Exception as e:
+                logger.warning(f"Redis rate limit check failed, using local store: {e}")
         
         # Remove old entries outside the window
-        RateLimitUtils._rate_limit_store[key] = [
-            timestamp for timestamp in RateLimitUtils._rate_limit_store[key]
-            if current_time - timestamp < window_seconds
-        ]
+        timestamps = RateLimitUtils._prune_local(key, current_time, window_seconds)
         
         # Check if limit exceeded
-        if len(RateLimitUtils._rate_limit_store[key]) >= max_requests:
+        if len(timestamps) >= max_requests:
             return False
         
         # Add current request
-        RateLimitUtils._rate_limit_store[key].append(current_time)
+        timestamps.append(current_time)
         return True
     
     @staticmethod
@@ -231,25 +284,40 @@ class RateLimitUtils:
         current_time = time.time()
         window_seconds = window_minutes * 60
         
+        client = cache_manager.get_client()
+        if client is not None:
+            try:
+                recent_requests = client.zcount(
+                    RateLimitUtils._redis_key(key), f"({current_time - window_seconds}", "+inf"
+                )
+                return max(0, max_requests - recent_requests)
+            except Exception as e:
+                logger.warning(f"Redis rate limit lookup failed, using local store: {e}")
+        
         if key not in RateLimitUtils._rate_limit_store:
             return max_requests
         
         # Count requests within window
-        recent_requests = len([
-            timestamp for timestamp in RateLimitUtils._rate_limit_store[key]
-            if current_time - timestamp < window_seconds
-        ])
+        recent_requests = len(RateLimitUtils._prune_local(key, current_time, window_seconds))
         
         return max(0, max_requests - recent_requests)
     
     @staticmethod
     def get_reset_time(key: str, window_minutes: int) -> Optional[float]:
         """Get time when rate limit resets for a key"""
+        client = cache_manager.get_client()
+        if client is not None:
+            try:
+                oldest = client.zrange(RateLimitUtils._redis_key(key), 0, 0, withscores=True)
+                return oldest[0][1] + (window_minutes * 60) if oldest else None
+            except Exception as e:
+                logger.warning(f"Redis rate limit lookup failed, using local store: {e}")
+        
         if key not in RateLimitUtils._rate_limit_store or not RateLimitUtils._rate_limit_store[key]:
             return None
         
-        # Find oldest request in current window
-        oldest_request = min(RateLimitUtils._rate_limit_store[key])
+        # Timestamps are appended in order, so the oldest is at the front
+        oldest_request = RateLimitUtils._rate_limit_store[key][0]
         return oldest_request + (window_minutes * 60)
 
 class AsyncUtils:
@@ -409,6 +477,10 @@ def parse_datetime(date_string: str, format_str: str = "%Y-%m-%d %H:%M:%S") -> O
     """Parse string to datetime"""
     return DateTimeUtils.parse_datetime(date_string, format_str)
 
+def parse_date(date_string: str) -> datetime:
+    """Parse YYYY-MM-DD to a midnight datetime"""
+    return DateTimeUtils.parse_date(date_string)
+
 def is_expired(timestamp: datetime, expiry_minutes: int = 30) -> bool:
     """Check if a timestamp has expired"""
     return DateTimeUtils.is_expired(timestamp, expiry_minutes)
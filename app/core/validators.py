@@ -2,7 +2,19 @@
 Custom validation functions for the application
 """
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+# Babcock University student ID: BU followed by 7 digits
+STUDENT_ID_PATTERN = r'^BU\d{7}$'
+
+# Compiled once at import; the validators below only run matches
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_STUDENT_ID_RE = re.compile(STUDENT_ID_PATTERN)
+_PHONE_PUNCTUATION_RE = re.compile(r'[\s\-\(\)]')
+# +2348012345678, 08012345678, +234801234567, 0801234567
+_NIGERIAN_PHONE_RE = re.compile(r'^(?:\+234|0)\d{9,10}$')
+_INTERNATIONAL_PHONE_RE = re.compile(r'^\+[1-9]\d{1,14}$')
 
 def validate_email(email: str) -> bool:
     """
@@ -11,10 +23,9 @@ def validate_email(email: str) -> bool:
     if not email:
         return False
     
-    # Basic email regex pattern
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(_EMAIL_RE.match(email))
 
+@lru_cache(maxsize=4096)
 def validate_student_id(student_id: str) -> bool:
     """
     Validate Babcock University student ID format
@@ -24,9 +35,9 @@ def validate_student_id(student_id: str) -> bool:
     if not student_id:
         return False
     
-    pattern = r'^BU\d{7}$'
-    return bool(re.match(pattern, student_id))
+    return bool(_STUDENT_ID_RE.match(student_id))
 
+@lru_cache(maxsize=4096)
 def validate_phone_number(phone: Optional[str]) -> bool:
     """
     Validate phone number format
@@ -36,23 +47,24 @@ def validate_phone_number(phone: Optional[str]) -> bool:
         return True  # Optional field
     
     # Remove spaces, dashes, and parentheses
-    cleaned = re.sub(r'[\s\-\(\)]', '', phone)
-    
-    # Nigerian phone number patterns
-    nigerian_patterns = [
-        r'^\+234\d{10}$',  # +2348012345678
-        r'^0\d{10}$',      # 08012345678
-        r'^\+234\d{9}$',   # +234801234567
-        r'^0\d{9}$',       # 0801234567
-    ]
-    
-    for pattern in nigerian_patterns:
-        if re.match(pattern, cleaned):
-            return True
+    cleaned = _PHONE_PUNCTUATION_RE.sub('', phone)
     
-    # International format (basic)
-    international_pattern = r'^\+[1-9]\d{1,14}$'
-    return bool(re.match(international_pattern, cleaned))
+    # Nigerian formats, then international format (basic)
+    return bool(_NIGERIAN_PHONE_RE.match(cleaned) or _INTERNATIONAL_PHONE_RE.match(cleaned))
+
+def validate_email_many(emails: Iterable[str]) -> List[bool]:
+    """Validate a batch of emails, binding the compiled matcher once"""
+    match = _EMAIL_RE.match
+    return [bool(email and match(email)) for email in emails]
+
+def validate_student_id_many(student_ids: Iterable[str]) -> List[bool]:
+    """Validate a batch of student IDs, binding the compiled matcher once"""
+    match = _STUDENT_ID_RE.match
+    return [bool(student_id and match(student_id)) for student_id in student_ids]
+
+def validate_phone_number_many(phones: Iterable[Optional[str]]) -> List[bool]:
+    """Validate a batch of phone numbers"""
+    return [validate_phone_number(phone) for phone in phones]
 
 def sanitize_input(text: str) -> str:
     """
@@ -1,6 +1,7 @@
 import logging
-from typing import Optional, Dict, Any
-from pymongo import MongoClient
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+from pymongo import IndexModel, MongoClient
 from pymongo.database import Database
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
 from pymongo.server_api import ServerApi
@@ -11,6 +12,71 @@ from .core.config import settings
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Indexes the routers rely on, created on connect with one createIndexes command per collection
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel("email", unique=True),
+        IndexModel("student_id", unique=True),
+        IndexModel([("full_name", 1), ("_id", 1)]),  # keyset-paged user listings
+        IndexModel([("department", 1), ("full_name", 1), ("_id", 1)]),  # listings by department
+        IndexModel([("level", 1), ("full_name", 1), ("_id", 1)]),  # listings by level
+        IndexModel([("is_active", 1), ("full_name", 1), ("_id", 1)]),  # listings by status
+        IndexModel("full_name_lc"),  # case-insensitive prefix search
+        IndexModel(
+            [("full_name", "text"), ("student_id", "text"), ("email", "text"), ("department", "text")],
+            name="users_text"
+        ),  # user search
+    ],
+    "attendance": [
+        IndexModel([("user_id", 1), ("class_id", 1), ("date", 1)], unique=True),
+        IndexModel("qr_code", unique=True),
+        # Equality on user_id (and status), then the date sort/range, per the ESR rule
+        IndexModel([("user_id", 1), ("date", -1)], name="user_date"),  # my attendance by date
+        IndexModel([("user_id", 1), ("status", 1), ("date", -1)], name="user_status_date"),
+    ],
+    "classes": [
+        IndexModel("course_code", unique=True),
+        IndexModel([("department", 1), ("level", 1)]),
+        IndexModel([("department", 1), ("level", 1), ("updated_at", -1)]),  # schedule ETags
+        IndexModel([("instructor_id", 1), ("date", 1), ("start_time", 1), ("end_time", 1)]),  # conflict checks
+        IndexModel(
+            [("department", 1), ("level", 1), ("date", 1), ("start_time", 1)],
+            name="active_schedule",
+            partialFilterExpression={"is_active": True}
+        ),  # schedule reads, active classes only
+        IndexModel([("is_active", 1), ("date", -1), ("_id", -1)]),  # class listings, keyset paging
+    ],
+    "cafeterias": [IndexModel("name", unique=True)],
+    "menu_items": [
+        IndexModel([("cafeteria_id", 1), ("category", 1)]),
+        IndexModel("name"),
+    ],
+    "schedules": [IndexModel([("user_id", 1), ("day_of_week", 1), ("start_time", 1)])],
+    "chat_rooms": [IndexModel("name", unique=True)],
+    "chat_messages": [
+        IndexModel([("room_id", 1), ("created_at", -1)]),
+        IndexModel("sender_id"),
+    ],
+    "locations": [
+        IndexModel(
+            [("latitude", 1), ("longitude", 1)],
+            name="active_coordinates_unique",
+            unique=True,
+            partialFilterExpression={"is_active": True}
+        ),  # one active location per coordinate pair
+        IndexModel([("location", "2dsphere")]),
+        IndexModel("category"),
+        IndexModel([("is_active", 1), ("category", 1), ("name", 1)]),  # filtered, name-sorted lists
+        IndexModel([("is_active", 1), ("visit_count", -1)]),  # most visited
+        IndexModel([("is_active", 1), ("category", 1), ("location", "2dsphere")]),  # categorized nearby
+        IndexModel(
+            [("name", "text"), ("tags", "text"), ("building", "text"), ("category", "text"), ("description", "text")],
+            weights={"name": 10, "tags": 5, "building": 3, "category": 3, "description": 1},
+            name="loc_text"
+        ),
+    ],
+}
+
 class DatabaseManager:
     """Manages MongoDB database connections with connection pooling and retry logic"""
     
@@ -23,6 +89,7 @@ class DatabaseManager:
         self._is_connected = False
         self._last_health_check = 0
         self._health_check_interval = 30  # seconds
+        self._indexes_ensured = False
         
     def connect(self) -> bool:
         """Establish connection to MongoDB with retry logic"""
@@ -65,6 +132,9 @@ class DatabaseManager:
                 # Log connection info
                 self._log_connection_info()
                 
+                # Derived fields and indexes the routers query by
+                self.ensure_indexes()
+                
                 return True
                 
             except (ConnectionFailure, ServerSelectionTimeoutError, OperationFailure) as e:
@@ -87,6 +157,46 @@ class DatabaseManager:
         
         return False
     
+    def ensure_indexes(self) -> bool:
+        """Backfill derived fields, then create INDEXES (once per process)"""
+        if self._indexes_ensured or self.database is None:
+            return self._indexes_ensured
+        database = self.database
+        
+        try:
+            # Lowercased names for case-insensitive prefix search
+            database.users.update_many(
+                {"full_name": {"$type": "string"}, "full_name_lc": {"$exists": False}},
+                [{"$set": {"full_name_lc": {"$toLower": "$full_name"}}}]
+            )
+            # GeoJSON points for locations created before the 2dsphere index
+            database.locations.update_many(
+                {"location": {"$exists": False}, "latitude": {"$type": "number"}, "longitude": {"$type": "number"}},
+                [{"$set": {"location": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}]
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Field backfill failed: {e}")
+        
+        # Collections are independent, so build them concurrently
+        failed = False
+        with ThreadPoolExecutor(max_workers=len(INDEXES), thread_name_prefix="indexes") as pool:
+            futures = {
+                name: pool.submit(database[name].create_indexes, models)
+                for name, models in INDEXES.items()
+            }
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    failed = True
+                    logger.warning(f"⚠️ Index creation failed for {name}: {e}")
+        
+        # Retry on the next connect if any collection failed
+        self._indexes_ensured = not failed
+        if not failed:
+            logger.info("✅ Database indexes ensured")
+        return self._indexes_ensured
+    
     def disconnect(self):
         """Close MongoDB connection"""
         try:
@@ -101,9 +211,13 @@ class DatabaseManager:
     
     def get_database(self) -> Database:
         """Get database instance, connecting if necessary"""
-        if not self._is_connected or not self.database:
-            if not self.connect():
-                raise ConnectionError("Failed to connect to MongoDB")
+        # Fast path: every request reuses the process-wide handle
+        database = self.database
+        if self._is_connected and database is not None:
+            return database
+        
+        if not self.connect():
+            raise ConnectionError("Failed to connect to MongoDB")
         return self.database
     
     def is_connected(self) -> bool:
@@ -174,7 +288,7 @@ class DatabaseManager:
     def _log_connection_info(self):
         """Log detailed connection information"""
         try:
-            if self.client and self.database:
+            if self.client and self.database is not None:
                 # Get server info
                 server_info = self.client.server_info()
                 
@@ -198,6 +312,10 @@ def connect_to_mongo() -> bool:
     """Connect to MongoDB"""
     return db_manager.connect()
 
+def ensure_indexes() -> bool:
+    """Backfill derived fields and create the application indexes"""
+    return db_manager.ensure_indexes()
+
 def close_mongo_connection():
     """Close MongoDB connection"""
     db_manager.disconnect()
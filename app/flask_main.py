@@ -3,9 +3,10 @@ Flask Main Application
 Replaces FastAPI for better deployment compatibility
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
+import atexit
 import logging
 import time
 from datetime import datetime
@@ -14,6 +15,7 @@ import os
 from .core.config import settings
 from .database import connect_to_mongo, close_mongo_connection, check_database_health
 from .core.exceptions import CustomHTTPException
+from .core.responses import ORJSONProvider
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +27,7 @@ logger = logging.getLogger(__name__)
 def create_app():
     """Create and configure Flask application"""
     app = Flask(__name__)
+    app.json = ORJSONProvider(app)
     
     # Configuration
     app.config['SECRET_KEY'] = settings.SECRET_KEY
@@ -101,8 +104,15 @@ def create_app():
             startup_duration = time.time() - startup_time
             logger.error(f"❌ Initialization failed after {startup_duration:.2f}s: {e}")
     
-    @app.teardown_appcontext
-    def shutdown(exception=None):
+    @app.before_request
+    def capture_request_time():
+        """Read the clock once per request so handlers share one timestamp"""
+        g.now = datetime.utcnow()
+    
+    # teardown_appcontext fires after every request, so closing the client
+    # there forced a reconnect per request; close it once at process exit
+    @atexit.register
+    def shutdown():
         """Application shutdown"""
         try:
             close_mongo_connection()
@@ -250,6 +260,7 @@ def create_app():
                 },
                 "maps": {
                     "GET /maps/locations": "Get campus locations",
+                    "GET /maps/nearby": "Get locations near a point, nearest first",
                     "GET /maps/navigation": "Get navigation between points"
                 },
                 "schedule": {
@@ -345,7 +356,11 @@ def create_app():
     @app.after_request
     def log_response_info(response):
         """Log all outgoing responses for debugging"""
-        logger.info(f"📤 Response: {response.status_code} - {response.get_data(as_text=True)[:200]}")
+        if response.is_streamed:
+            # Reading the body here would buffer the whole stream
+            logger.info(f"📤 Response: {response.status_code} - <streamed>")
+        else:
+            logger.info(f"📤 Response: {response.status_code} - {response.get_data(as_text=True)[:200]}")
         return response
     
     # Register blueprints (routes)
@@ -3,7 +3,13 @@ from typing import Optional, List
 from bson import ObjectId
 import secrets
 import string
-from ..schemas.cafeteria import MealType, FoodCategory
+from ..schemas.cafeteria import MealType, FoodCategory, MEAL_TYPES, FOOD_CATEGORIES
+
+def _choice(value: str, choices: tuple, kind: str) -> str:
+    """Return value if it is one of choices, else raise ValueError"""
+    if value not in choices:
+        raise ValueError(f"{value!r} is not a valid {kind}")
+    return value
 
 class FoodItemModel:
     def __init__(
@@ -43,7 +49,7 @@ class FoodItemModel:
             "_id": ObjectId(self._id) if self._id else None,
             "name": self.name,
             "description": self.description,
-            "category": self.category.value if isinstance(self.category, FoodCategory) else self.category,
+            "category": self.category,
             "price": self.price,
             "calories": self.calories,
             "allergens": self.allergens,
@@ -62,7 +68,7 @@ class FoodItemModel:
             _id=str(data.get('_id', '')),
             name=data.get('name', ''),
             description=data.get('description', ''),
-            category=FoodCategory(data.get('category', FoodCategory.MAIN_COURSE.value)),
+            category=_choice(data.get('category', "main_course"), FOOD_CATEGORIES, "food category"),
             price=data.get('price', 0.0),
             calories=data.get('calories'),
             allergens=data.get('allergens', []),
@@ -122,7 +128,7 @@ class CafeteriaQRCodeModel:
             "full_name": self.full_name,
             "department": self.department,
             "level": self.level,
-            "meal_type": self.meal_type.value if isinstance(self.meal_type, MealType) else self.meal_type,
+            "meal_type": self.meal_type,
             "date": self.date,
             "qr_code": self.qr_code,
             "is_used": self.is_used,
@@ -141,7 +147,7 @@ class CafeteriaQRCodeModel:
             full_name=data.get('full_name', ''),
             department=data.get('department', ''),
             level=data.get('level', ''),
-            meal_type=MealType(data.get('meal_type', MealType.BREAKFAST.value)),
+            meal_type=_choice(data.get('meal_type', "breakfast"), MEAL_TYPES, "meal type"),
             date=data.get('date'),
             qr_code=data.get('qr_code'),
             is_used=data.get('is_used', False),
@@ -188,7 +194,7 @@ class MenuDayModel:
         return {
             "_id": ObjectId(self._id) if self._id else None,
             "date": self.date,
-            "meal_type": self.meal_type.value if isinstance(self.meal_type, MealType) else self.meal_type,
+            "meal_type": self.meal_type,
             "food_items": self.food_items,
             "is_active": self.is_active,
             "created_at": self.created_at,
@@ -200,7 +206,7 @@ class MenuDayModel:
         return cls(
             _id=str(data.get('_id', '')),
             date=data.get('date'),
-            meal_type=MealType(data.get('meal_type', MealType.BREAKFAST.value)),
+            meal_type=_choice(data.get('meal_type', "breakfast"), MEAL_TYPES, "meal type"),
             food_items=data.get('food_items', []),
             is_active=data.get('is_active', True),
             created_at=data.get('created_at'),
@@ -3,6 +3,9 @@ from typing import Optional, List
 from bson import ObjectId
 from pydantic import BaseModel, Field
 
+from ..schemas._types import Latitude, Longitude
+from ..schemas.maps import ShortName, Description, Address, Code, ShortText, Url, Floor
+
 class LocationModel(BaseModel):
     """MongoDB model for locations"""
     
@@ -10,22 +13,22 @@ class LocationModel(BaseModel):
     _id: Optional[ObjectId] = Field(default_factory=ObjectId, alias="_id")
     
     # Location details
-    name: str = Field(..., min_length=1, max_length=100)
-    description: str = Field(..., min_length=1, max_length=500)
+    name: ShortName
+    description: Description
     category: str = Field(..., description="Location category")
-    latitude: float = Field(..., ge=-90, le=90)
-    longitude: float = Field(..., ge=-180, le=180)
-    address: str = Field(..., min_length=1, max_length=200)
+    latitude: Latitude
+    longitude: Longitude
+    address: Address
     
     # Building details
-    building_code: Optional[str] = Field(None, max_length=20)
-    floor: Optional[int] = Field(None, ge=0, le=100)
-    room_number: Optional[str] = Field(None, max_length=20)
+    building_code: Optional[Code] = None
+    floor: Optional[Floor] = None
+    room_number: Optional[Code] = None
     
     # Additional info
-    opening_hours: Optional[str] = Field(None, max_length=100)
-    contact_info: Optional[str] = Field(None, max_length=100)
-    image_url: Optional[str] = Field(None, max_length=255)
+    opening_hours: Optional[ShortText] = None
+    contact_info: Optional[ShortText] = None
+    image_url: Optional[Url] = None
     tags: List[str] = Field(default_factory=list)
     
     # Status and metrics
@@ -44,12 +47,11 @@ class LocationModel(BaseModel):
     
     class Config:
         populate_by_name = True
-        json_encoders = {ObjectId: str}
         arbitrary_types_allowed = True
 
     def to_dict(self) -> dict:
         """Convert model to dictionary for MongoDB operations"""
-        data = self.dict(exclude={"_id"})
+        data = self.model_dump(exclude={"_id"})
         if self._id:
             data["_id"] = self._id
         return data
@@ -3,6 +3,13 @@ from typing import Optional, List
 from bson import ObjectId
 from ..schemas.user import UserRole, UserStatus
 
+# Role groups and defaults, resolved once at import
+ADMIN_ROLES = frozenset({UserRole.DEPARTMENT_ADMIN, UserRole.CAFETERIA_ADMIN, UserRole.SUPER_ADMIN})
+USER_MANAGER_ROLES = frozenset({UserRole.DEPARTMENT_ADMIN, UserRole.SUPER_ADMIN})
+CAFETERIA_MANAGER_ROLES = frozenset({UserRole.CAFETERIA_ADMIN, UserRole.SUPER_ADMIN})
+_DEFAULT_ROLE = UserRole.STUDENT.value
+_DEFAULT_STATUS = UserStatus.ACTIVE.value
+
 class UserModel:
     def __init__(
         self,
@@ -46,6 +53,7 @@ class UserModel:
             "student_id": self.student_id,
             "email": self.email,
             "full_name": self.full_name,
+            "full_name_lc": self.full_name.lower() if isinstance(self.full_name, str) else None,
             "department": self.department,
             "level": self.level,
             "password_hash": self.password_hash,
@@ -86,8 +94,8 @@ class UserModel:
             level=data.get('level', ''),
             password_hash=data.get('password_hash', ''),
             phone_number=data.get('phone_number'),
-            role=UserRole(data.get('role', UserRole.STUDENT.value)),
-            status=UserStatus(data.get('status', UserStatus.ACTIVE.value)),
+            role=UserRole(data.get('role', _DEFAULT_ROLE)),
+            status=UserStatus(data.get('status', _DEFAULT_STATUS)),
             profile_picture=data.get('profile_picture'),
             is_active=data.get('is_active', True),
             is_verified=data.get('is_verified', False),
@@ -113,15 +121,15 @@ class UserModel:
 
     def is_admin(self) -> bool:
         """Check if user is any type of admin"""
-        return self.role in [UserRole.DEPARTMENT_ADMIN, UserRole.CAFETERIA_ADMIN, UserRole.SUPER_ADMIN]
+        return self.role in ADMIN_ROLES
 
     def can_manage_users(self) -> bool:
         """Check if user can manage other users"""
-        return self.role in [UserRole.DEPARTMENT_ADMIN, UserRole.SUPER_ADMIN]
+        return self.role in USER_MANAGER_ROLES
 
     def can_manage_cafeteria(self) -> bool:
         """Check if user can manage cafeteria operations"""
-        return self.role in [UserRole.CAFETERIA_ADMIN, UserRole.SUPER_ADMIN]
+        return self.role in CAFETERIA_MANAGER_ROLES
 
     def to_response_dict(self) -> dict:
         """Convert to response format (without sensitive data)"""
@@ -3,23 +3,38 @@ Flask Attendance Router
 Full attendance management functionality
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
 from datetime import datetime, timedelta
 from bson import ObjectId
 import hashlib
 import secrets
-import json
+import orjson
 
 from ..database import get_database
 from ..core.exceptions import CustomHTTPException
+from ..core.utils import parse_date
+from ..core.responses import ojson
 from ..core.qr_generator import LightweightQRGenerator
 
 logger = logging.getLogger(__name__)
 
 attendance_bp = Blueprint('attendance', __name__)
 
+# Class creation only needs the caller's id, role and display name
+_INSTRUCTOR_PROJECTION = {"_id": 1, "is_instructor": 1, "full_name": 1}
+
+# Attendance stats only need the caller's id and scope
+_STATS_USER_PROJECTION = {"_id": 1, "department": 1, "level": 1}
+
+# Conflict checks only report which classes overlap
+_CONFLICT_PROJECTION = {"course_code": 1, "_id": 0}
+_MAX_REPORTED_CONFLICTS = 5
+
+# Newest first, with _id as the tiebreaker that makes keyset paging stable
+_SORT_CLASSES = [("date", -1), ("_id", -1)]
+
 @attendance_bp.route('/classes', methods=['POST'])
 @jwt_required()
 def create_class():
@@ -37,33 +52,31 @@ def create_class():
         db = get_database()
         
         # Check if current user is instructor
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _INSTRUCTOR_PROJECTION)
         if not current_user or not current_user.get('is_instructor', False):
             raise CustomHTTPException(403, "Only instructors can create classes")
         
         # Parse date and times
         try:
-            class_date = datetime.strptime(data['date'], "%Y-%m-%d")
+            class_date = parse_date(data['date'])
             start_time = datetime.strptime(data['start_time'], "%H:%M").time()
             end_time = datetime.strptime(data['end_time'], "%H:%M").time()
         except ValueError:
             raise CustomHTTPException(400, "Invalid date or time format")
         
-        # Check for class conflicts
+        # Check for class conflicts (overlapping time range on the same day)
         conflict_query = {
             "instructor_id": str(current_user['_id']),
             "date": class_date,
-            "$or": [
-                {
-                    "start_time": {"$lt": end_time},
-                    "end_time": {"$gt": start_time}
-                }
-            ]
+            "start_time": {"$lt": end_time},
+            "end_time": {"$gt": start_time}
         }
         
-        existing_conflict = db.classes.find_one(conflict_query)
-        if existing_conflict:
-            raise CustomHTTPException(409, "Class time conflicts with existing class")
+        # One bounded, projected read; the no-conflict case returns an empty first batch
+        conflicts = db.classes.find(conflict_query, _CONFLICT_PROJECTION).limit(_MAX_REPORTED_CONFLICTS)
+        course_codes = [c.get('course_code', '') for c in conflicts]
+        if course_codes:
+            raise CustomHTTPException(409, f"Class time conflicts with existing class: {', '.join(course_codes)}")
         
         # Create class document
         class_doc = {
@@ -80,8 +93,8 @@ def create_class():
             "max_students": data.get('max_students', 50),
             "description": data.get('description', ''),
             "is_active": True,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": g.now,
+            "updated_at": g.now
         }
         
         result = db.classes.insert_one(class_doc)
@@ -89,7 +102,7 @@ def create_class():
         
         logger.info(f"Class created: {class_doc['course_code']} by instructor {current_user_email}")
         
-        return jsonify({
+        return ojson({
             "message": "Class created successfully",
             "class": class_doc
         }), 201
@@ -115,6 +128,8 @@ def get_classes():
         instructor_id = request.args.get('instructor_id')
         date = request.args.get('date')
         is_active = request.args.get('is_active', 'true').lower() == 'true'
+        after_date = request.args.get('after_date')
+        after_id = request.args.get('after_id')
         
         # Build filter query
         filter_query = {"is_active": is_active}
@@ -129,29 +144,58 @@ def get_classes():
             filter_query["instructor_id"] = instructor_id
         if date:
             try:
-                filter_date = datetime.strptime(date, "%Y-%m-%d")
+                filter_date = parse_date(date)
                 filter_query["date"] = filter_date
             except ValueError:
                 raise CustomHTTPException(400, "Invalid date format. Use YYYY-MM-DD")
         
-        # Get total count
-        total_count = db.classes.count_documents(filter_query)
-        
-        # Get classes with pagination
-        classes_cursor = db.classes.find(filter_query).sort("date", -1).skip(skip).limit(limit)
-        classes = []
-        
-        for class_data in classes_cursor:
-            class_data['_id'] = str(class_data['_id'])
-            classes.append(class_data)
-        
-        return jsonify({
+        if after_date or after_id:
+            # Keyset page: seek past the last (date, _id) already returned
+            if not (after_date and after_id) or not ObjectId.is_valid(after_id):
+                raise CustomHTTPException(400, "after_date and after_id must be given together")
+            try:
+                cursor_date = parse_date(after_date)
+            except ValueError:
+                raise CustomHTTPException(400, "Invalid after_date format. Use YYYY-MM-DD")
+            keyset_query = {
+                **filter_query,
+                "$or": [
+                    {"date": {"$lt": cursor_date}},
+                    {"date": cursor_date, "_id": {"$lt": ObjectId(after_id)}}
+                ]
+            }
+            classes = list(db.classes.find(keyset_query).sort(_SORT_CLASSES).limit(limit + 1))
+            has_more = len(classes) > limit
+            classes = classes[:limit]
+            total_count = None
+        else:
+            # Get one page and the total count in a single round-trip
+            page = next(db.classes.aggregate([
+                {"$match": filter_query},
+                {"$facet": {
+                    "data": [{"$sort": dict(_SORT_CLASSES)}, {"$skip": skip}, {"$limit": limit}],
+                    "meta": [{"$count": "total"}]
+                }}
+            ]), {})
+            classes = page.get("data", [])
+            meta = page.get("meta") or [{"total": 0}]
+            total_count = meta[0]["total"]
+            has_more = skip + limit < total_count
+        
+        # Cursor for the next keyset page
+        next_cursor = None
+        if has_more and classes:
+            last = classes[-1]
+            next_cursor = {"after_date": last["date"].strftime("%Y-%m-%d"), "after_id": str(last["_id"])}
+        
+        return ojson({
             "classes": classes,
             "total_count": total_count,
             "pagination": {
                 "skip": skip,
                 "limit": limit,
-                "has_more": skip + limit < total_count
+                "has_more": has_more,
+                "next_cursor": next_cursor
             }
         })
         
@@ -168,6 +212,7 @@ def generate_qr_code(class_id):
     try:
         if not ObjectId.is_valid(class_id):
             raise CustomHTTPException(400, "Invalid class ID format")
+        class_oid = ObjectId(class_id)
         
         current_user_email = get_jwt_identity()
         db = get_database()
@@ -178,7 +223,7 @@ def generate_qr_code(class_id):
             raise CustomHTTPException(403, "Only instructors can generate QR codes")
         
         # Get class information
-        class_data = db.classes.find_one({"_id": ObjectId(class_id)})
+        class_data = db.classes.find_one({"_id": class_oid})
         if not class_data:
             raise CustomHTTPException(404, "Class not found")
         
@@ -187,21 +232,23 @@ def generate_qr_code(class_id):
             raise CustomHTTPException(403, "Only class instructor can generate QR codes")
         
         # Check if class is active and not expired
-        now = datetime.utcnow()
+        now = g.now
         class_date = class_data["date"]
         if class_date.date() < now.date():
             raise CustomHTTPException(400, "Cannot generate QR code for past classes")
         
         # Generate unique QR code data
+        expires_at = class_date + timedelta(hours=2)
         qr_data = {
             "class_id": class_id,
             "timestamp": now.isoformat(),
             "nonce": secrets.token_hex(16),
-            "expires_at": (class_date + timedelta(hours=2)).isoformat()
+            "expires_at": expires_at.isoformat()
         }
         
-        qr_json = json.dumps(qr_data)
-        qr_hash = hashlib.sha256(qr_json.encode()).hexdigest()
+        qr_bytes = orjson.dumps(qr_data)
+        qr_json = qr_bytes.decode()
+        qr_hash = hashlib.sha256(qr_bytes).hexdigest()
         
         # Create QR code using lightweight generator
         qr_info = LightweightQRGenerator.generate_qr_info(qr_json)
@@ -209,10 +256,10 @@ def generate_qr_code(class_id):
         
         # Store QR code in database
         qr_doc = {
-            "class_id": ObjectId(class_id),
+            "class_id": class_oid,
             "qr_hash": qr_hash,
             "qr_data": qr_data,
-            "expires_at": datetime.fromisoformat(qr_data["expires_at"]),
+            "expires_at": expires_at,
             "is_active": True,
             "created_at": now,
             "created_by": str(current_user["_id"])
@@ -222,13 +269,13 @@ def generate_qr_code(class_id):
         
         # Update class with QR code info
         db.classes.update_one(
-            {"_id": ObjectId(class_id)},
-            {"$set": {"current_qr_code": qr_hash, "qr_generated_at": now}}
+            {"_id": class_oid},
+            {"$set": {"current_qr_code": qr_hash, "qr_generated_at": now, "updated_at": now}}
         )
         
         logger.info(f"QR code generated for class {class_id}")
         
-        return jsonify({
+        return ojson({
             "qr_code": qr_base64,
             "qr_hash": qr_hash,
             "expires_at": qr_data["expires_at"],
@@ -274,28 +321,29 @@ def scan_qr_code():
             raise CustomHTTPException(400, "QR code is no longer active")
         
         # Check expiration
-        if datetime.utcnow() > qr_doc["expires_at"]:
+        if g.now > qr_doc["expires_at"]:
             raise CustomHTTPException(400, "QR code has expired")
         
         class_id = str(qr_doc["class_id"])
+        class_oid = ObjectId(class_id)
         
         # Check if already marked attendance
         existing_attendance = db.attendance.find_one({
-            "class_id": ObjectId(class_id),
-            "user_id": ObjectId(current_user["_id"]),
-            "date": {"$gte": datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)}
+            "class_id": class_oid,
+            "user_id": current_user["_id"],
+            "date": {"$gte": g.now.replace(hour=0, minute=0, second=0, microsecond=0)}
         })
         
         if existing_attendance:
             raise CustomHTTPException(409, "Attendance already marked for this class today")
         
         # Get class information
-        class_data = db.classes.find_one({"_id": ObjectId(class_id)})
+        class_data = db.classes.find_one({"_id": class_oid})
         if not class_data:
             raise CustomHTTPException(404, "Class not found")
         
         # Determine attendance status based on time
-        now = datetime.utcnow()
+        now = g.now
         class_start = datetime.combine(class_data["date"].date(), class_data["start_time"])
         class_end = datetime.combine(class_data["date"].date(), class_data["end_time"])
         
@@ -310,8 +358,8 @@ def scan_qr_code():
         
         # Create attendance record
         attendance_doc = {
-            "class_id": ObjectId(class_id),
-            "user_id": ObjectId(current_user["_id"]),
+            "class_id": class_oid,
+            "user_id": current_user["_id"],
             "student_id": current_user["student_id"],
             "full_name": current_user["full_name"],
             "department": current_user["department"],
@@ -332,7 +380,7 @@ def scan_qr_code():
         
         logger.info(f"Attendance marked: {current_user['student_id']} for class {class_data['course_code']}")
         
-        return jsonify({
+        return ojson({
             "message": "Attendance marked successfully",
             "attendance_id": str(result.inserted_id),
             "status": status,
@@ -371,19 +419,19 @@ def get_my_attendance():
         status = request.args.get('status')
         
         # Build filter query
-        filter_query = {"user_id": ObjectId(current_user["_id"])}
+        filter_query = {"user_id": current_user["_id"]}
         
         if start_date or end_date:
             date_filter = {}
             if start_date:
                 try:
-                    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+                    start_dt = parse_date(start_date)
                     date_filter["$gte"] = start_dt
                 except ValueError:
                     raise CustomHTTPException(400, "Invalid start date format. Use YYYY-MM-DD")
             if end_date:
                 try:
-                    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+                    end_dt = parse_date(end_date)
                     date_filter["$lte"] = end_dt
                 except ValueError:
                     raise CustomHTTPException(400, "Invalid end date format. Use YYYY-MM-DD")
@@ -396,16 +444,11 @@ def get_my_attendance():
         total_count = db.attendance.count_documents(filter_query)
         
         # Get attendance records with pagination
-        attendance_cursor = db.attendance.find(filter_query).sort("date", -1).skip(skip).limit(limit)
-        attendance_records = []
-        
-        for record in attendance_cursor:
-            record["_id"] = str(record["_id"])
-            record["class_id"] = str(record["class_id"])
-            record["user_id"] = str(record["user_id"])
-            attendance_records.append(record)
+        attendance_records = list(
+            db.attendance.find(filter_query).sort("date", -1).skip(skip).limit(limit)
+        )
         
-        return jsonify({
+        return ojson({
             "attendance_records": attendance_records,
             "total_count": total_count,
             "pagination": {
@@ -430,7 +473,7 @@ def get_attendance_stats():
         db = get_database()
         
         # Get current user
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _STATS_USER_PROJECTION)
         if not current_user:
             raise CustomHTTPException(404, "User not found")
         
@@ -438,7 +481,7 @@ def get_attendance_stats():
         level = current_user["level"]
         
         # Calculate date ranges
-        now = datetime.utcnow()
+        now = g.now
         week_ago = now - timedelta(days=7)
         month_ago = now - timedelta(days=30)
         
@@ -450,68 +493,49 @@ def get_attendance_stats():
             "is_active": True
         })
         
-        # Get attendance records
-        attendance_pipeline = [
-            {
-                "$match": {
-                    "user_id": ObjectId(current_user["_id"]),
-                    "date": {"$lte": now}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$status",
-                    "count": {"$sum": 1}
-                }
-            }
-        ]
-        
-        attendance_by_status_result = list(db.attendance.aggregate(attendance_pipeline))
-        attendance_by_status = {item["_id"]: item["count"] for item in attendance_by_status_result}
+        # Status, weekly and monthly breakdowns of the user's attendance in one pass
+        stats = next(db.attendance.aggregate([
+            {"$match": {"user_id": current_user["_id"]}},
+            {"$facet": {
+                "by_status": [
+                    {"$match": {"date": {"$lte": now}}},
+                    {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+                    {"$group": {
+                        "_id": None,
+                        "by_status": {"$push": {"k": "$_id", "v": "$count"}},
+                        "total": {"$sum": "$count"}
+                    }},
+                    {"$project": {"_id": 0, "by_status": {"$arrayToObject": "$by_status"}, "total": 1}}
+                ],
+                "weekly": [
+                    {"$match": {"date": {"$gte": week_ago}}},
+                    {"$group": {
+                        "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
+                        "count": {"$sum": 1}
+                    }},
+                    {"$sort": {"_id": 1}}
+                ],
+                "monthly": [
+                    {"$match": {"date": {"$gte": month_ago}}},
+                    {"$group": {
+                        "_id": {"$dateToString": {"format": "%Y-%m", "date": "$date"}},
+                        "count": {"$sum": 1}
+                    }},
+                    {"$sort": {"_id": 1}}
+                ]
+            }}
+        ]), {})
+        
+        status_totals = (stats.get("by_status") or [{}])[0]
+        attendance_by_status = status_totals.get("by_status", {})
+        total_attendance = status_totals.get("total", 0)
+        weekly_attendance = stats.get("weekly", [])
+        monthly_attendance = stats.get("monthly", [])
         
         # Calculate attendance rate
-        total_attendance = sum(attendance_by_status.values())
         attendance_rate = (total_attendance / total_classes * 100) if total_classes > 0 else 0
         
-        # Weekly attendance
-        weekly_pipeline = [
-            {
-                "$match": {
-                    "user_id": ObjectId(current_user["_id"]),
-                    "date": {"$gte": week_ago}
-                }
-            },
-            {
-                "$group": {
-                    "_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}},
-                    "count": {"$sum": 1}
-                }
-            },
-            {"$sort": {"_id": 1}}
-        ]
-        
-        weekly_attendance = list(db.attendance.aggregate(weekly_pipeline))
-        
-        # Monthly attendance
-        monthly_pipeline = [
-            {
-                "$match": {
-                    "user_id": ObjectId(current_user["_id"]),
-                    "date": {"$gte": month_ago}
-                }
-            },
-            {
-                "$group": {
-                    "_id": {"$dateToString": {"format": "%Y-%m", "date": "$date"}},
-                    "count": {"$sum": 1}
-                }
-            },
-            {"$sort": {"_id": 1}}
-        ]
-        
-        monthly_attendance = list(db.attendance.aggregate(monthly_pipeline))
-        
-        return jsonify({
+        return ojson({
             "total_classes": total_classes,
             "total_attendance": total_attendance,
             "attendance_rate": round(attendance_rate, 2),
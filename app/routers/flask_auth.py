@@ -3,16 +3,17 @@ Flask Auth Router
 Replaces FastAPI auth router for better deployment compatibility
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from werkzeug.security import generate_password_hash, check_password_hash
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from bson import ObjectId
 
 from ..database import get_database
 from ..core.config import settings
 from ..core.exceptions import CustomHTTPException
+from ..core.cache import cache_delete, cache_incr, USER_STATS_CACHE_KEY, USER_COUNT_VERSION_KEY
 
 logger = logging.getLogger(__name__)
 
@@ -53,30 +54,42 @@ def register():
         for field in required_fields:
             if not data.get(field):
                 raise CustomHTTPException(400, f"Missing required field: {field}")
+        if not isinstance(data['full_name'], str):
+            raise CustomHTTPException(400, "full_name must be a string")
         
         db = get_database()
         
-        # Check if user already exists
-        existing_user = db.users.find_one({"email": data['email']})
+        # Check email and student ID uniqueness in one index-union lookup
+        existing_user = db.users.find_one(
+            {"$or": [{"email": data['email']}, {"student_id": data['student_id']}]},
+            {"_id": 0, "email": 1, "student_id": 1}
+        )
         if existing_user:
-            raise CustomHTTPException(400, "An account with this email already exists")
+            if existing_user.get('email') == data['email']:
+                raise CustomHTTPException(400, "An account with this email already exists")
+            raise CustomHTTPException(400, "An account with this student ID already exists")
         
         # Create user document with modern password hashing
         user_doc = {
             "email": data['email'],
             "password_hash": generate_password_hash(data['password'], method='scrypt'),
             "full_name": data['full_name'],
+            "full_name_lc": data['full_name'].lower(),
             "student_id": data['student_id'],
             "department": data['department'],
             "level": data['level'],
             "is_active": True,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": g.now,
+            "updated_at": g.now
         }
         
         result = db.users.insert_one(user_doc)
         user_doc['_id'] = str(result.inserted_id)
         
+        # New users change the admin stats breakdowns
+        cache_delete(USER_STATS_CACHE_KEY)
+        cache_incr(USER_COUNT_VERSION_KEY)
+        
         # Create access token
         access_token = create_access_token(identity=data['email'])
         refresh_token = create_refresh_token(identity=data['email'])
@@ -146,7 +159,7 @@ def login():
                 new_hash = generate_password_hash(data['password'], method='scrypt')
                 db.users.update_one(
                     {"_id": user['_id']}, 
-                    {"$set": {"password_hash": new_hash, "updated_at": datetime.utcnow()}}
+                    {"$set": {"password_hash": new_hash, "updated_at": g.now}}
                 )
                 logger.info(f"Password hash migrated successfully for user: {data['email']}")
             except Exception as migration_error:
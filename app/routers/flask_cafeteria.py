@@ -3,14 +3,16 @@ Flask Cafeteria Router
 Basic cafeteria management functionality
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from bson import ObjectId
 
 from ..database import get_database
 from ..core.exceptions import CustomHTTPException
+from ..core.responses import ojson
+from ..core.utils import parse_date
 
 logger = logging.getLogger(__name__)
 
@@ -31,27 +33,22 @@ def get_menu():
         
         if date:
             try:
-                menu_date = datetime.strptime(date, "%Y-%m-%d")
+                menu_date = parse_date(date)
                 filter_query["date"] = menu_date
             except ValueError:
                 raise CustomHTTPException(400, "Invalid date format. Use YYYY-MM-DD")
         else:
             # Default to today
-            today = datetime.utcnow().date()
+            today = g.now.date()
             filter_query["date"] = today
         
         if meal_type:
             filter_query["meal_type"] = meal_type
         
         # Get menu items
-        menu_cursor = db.menu_items.find(filter_query).sort("meal_type", 1)
-        menu = []
+        menu = list(db.menu_items.find(filter_query).sort("meal_type", 1))
         
-        for item in menu_cursor:
-            item['_id'] = str(item['_id'])
-            menu.append(item)
-        
-        return jsonify({
+        return ojson({
             "menu": menu,
             "total_items": len(menu)
         })
@@ -85,7 +82,7 @@ def create_menu_item():
         
         # Parse date
         try:
-            menu_date = datetime.strptime(data['date'], "%Y-%m-%d")
+            menu_date = parse_date(data['date'])
         except ValueError:
             raise CustomHTTPException(400, "Invalid date format. Use YYYY-MM-DD")
         
@@ -101,8 +98,8 @@ def create_menu_item():
             "is_available": data.get('is_available', True),
             "is_active": True,
             "created_by": str(current_user['_id']),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": g.now,
+            "updated_at": g.now
         }
         
         result = db.menu_items.insert_one(menu_item)
@@ -170,17 +167,17 @@ def create_order():
         
         # Create order
         order = {
-            "user_id": ObjectId(current_user['_id']),
+            "user_id": current_user['_id'],
             "student_id": current_user['student_id'],
             "full_name": current_user['full_name'],
             "items": order_items,
             "total_amount": total_amount,
             "status": "pending",
-            "order_time": datetime.utcnow(),
-            "estimated_ready_time": datetime.utcnow() + timedelta(minutes=20),
+            "order_time": g.now,
+            "estimated_ready_time": g.now + timedelta(minutes=20),
             "notes": data.get('notes', ''),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": g.now,
+            "updated_at": g.now
         }
         
         result = db.orders.insert_one(order)
@@ -218,21 +215,15 @@ def get_my_orders():
         limit = min(int(request.args.get('limit', 20)), 100)
         
         # Build filter query
-        filter_query = {"user_id": ObjectId(current_user['_id'])}
+        filter_query = {"user_id": current_user['_id']}
         
         if status:
             filter_query["status"] = status
         
         # Get orders
-        orders_cursor = db.orders.find(filter_query).sort("created_at", -1).limit(limit)
-        orders = []
-        
-        for order in orders_cursor:
-            order['_id'] = str(order['_id'])
-            order['user_id'] = str(order['user_id'])
-            orders.append(order)
+        orders = list(db.orders.find(filter_query).sort("created_at", -1).limit(limit))
         
-        return jsonify({
+        return ojson({
             "orders": orders,
             "total_orders": len(orders)
         })
@@ -268,10 +259,7 @@ def get_order(order_id):
         if str(order['user_id']) != str(current_user['_id']) and not current_user.get('is_admin', False):
             raise CustomHTTPException(403, "Insufficient privileges")
         
-        order['_id'] = str(order['_id'])
-        order['user_id'] = str(order['user_id'])
-        
-        return jsonify(order)
+        return ojson(order)
         
     except CustomHTTPException:
         raise
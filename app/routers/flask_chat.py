@@ -3,14 +3,15 @@ Flask Chat Router
 Basic chat functionality
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
-from datetime import datetime
+import re
 from bson import ObjectId
 
 from ..database import get_database
 from ..core.exceptions import CustomHTTPException
+from ..core.responses import ojson
 
 logger = logging.getLogger(__name__)
 
@@ -43,14 +44,14 @@ def create_chat_room():
         room = {
             "name": data['name'],
             "description": data.get('description', ''),
-            "created_by": ObjectId(current_user['_id']),
+            "created_by": current_user['_id'],
             "creator_name": current_user['full_name'],
             "is_public": data.get('is_public', True),
             "max_members": data.get('max_members', 100),
-            "members": [ObjectId(current_user['_id'])],
+            "members": [current_user['_id']],
             "is_active": True,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": g.now,
+            "updated_at": g.now
         }
         
         result = db.chat_rooms.insert_one(room)
@@ -95,23 +96,21 @@ def get_chat_rooms():
             filter_query["is_public"] = is_public.lower() == 'true'
         
         if search:
+            # Match the search text literally, not as a user-supplied pattern
+            pattern = re.escape(search)
             filter_query["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}}
+                {"name": {"$regex": pattern, "$options": "i"}},
+                {"description": {"$regex": pattern, "$options": "i"}}
             ]
         
         # Get chat rooms
-        rooms_cursor = db.chat_rooms.find(filter_query).sort("created_at", -1)
-        rooms = []
+        rooms = list(db.chat_rooms.aggregate([
+            {"$match": filter_query},
+            {"$sort": {"created_at": -1}},
+            {"$addFields": {"member_count": {"$size": {"$ifNull": ["$members", []]}}}}
+        ]))
         
-        for room in rooms_cursor:
-            room['_id'] = str(room['_id'])
-            room['created_by'] = str(room['created_by'])
-            room['members'] = [str(member) for member in room['members']]
-            room['member_count'] = len(room['members'])
-            rooms.append(room)
-        
-        return jsonify({
+        return ojson({
             "rooms": rooms,
             "total_rooms": len(rooms)
         })
@@ -129,6 +128,7 @@ def join_chat_room(room_id):
     try:
         if not ObjectId.is_valid(room_id):
             raise CustomHTTPException(400, "Invalid room ID format")
+        room_oid = ObjectId(room_id)
         
         current_user_email = get_jwt_identity()
         db = get_database()
@@ -139,12 +139,12 @@ def join_chat_room(room_id):
             raise CustomHTTPException(404, "User not found")
         
         # Get chat room
-        room = db.chat_rooms.find_one({"_id": ObjectId(room_id), "is_active": True})
+        room = db.chat_rooms.find_one({"_id": room_oid, "is_active": True})
         if not room:
             raise CustomHTTPException(404, "Chat room not found")
         
         # Check if user is already a member
-        if ObjectId(current_user['_id']) in room['members']:
+        if current_user['_id'] in room['members']:
             raise CustomHTTPException(409, "Already a member of this room")
         
         # Check if room is full
@@ -153,10 +153,10 @@ def join_chat_room(room_id):
         
         # Add user to room
         result = db.chat_rooms.update_one(
-            {"_id": ObjectId(room_id)},
+            {"_id": room_oid},
             {
-                "$addToSet": {"members": ObjectId(current_user['_id'])},
-                "$set": {"updated_at": datetime.utcnow()}
+                "$addToSet": {"members": current_user['_id']},
+                "$set": {"updated_at": g.now}
             }
         )
         
@@ -183,6 +183,7 @@ def send_message(room_id):
     try:
         if not ObjectId.is_valid(room_id):
             raise CustomHTTPException(400, "Invalid room ID format")
+        room_oid = ObjectId(room_id)
         
         current_user_email = get_jwt_identity()
         data = request.get_json()
@@ -198,25 +199,25 @@ def send_message(room_id):
             raise CustomHTTPException(404, "User not found")
         
         # Get chat room
-        room = db.chat_rooms.find_one({"_id": ObjectId(room_id), "is_active": True})
+        room = db.chat_rooms.find_one({"_id": room_oid, "is_active": True})
         if not room:
             raise CustomHTTPException(404, "Chat room not found")
         
         # Check if user is a member
-        if ObjectId(current_user['_id']) not in room['members']:
+        if current_user['_id'] not in room['members']:
             raise CustomHTTPException(403, "You must be a member to send messages")
         
         # Create message
         message = {
-            "room_id": ObjectId(room_id),
-            "user_id": ObjectId(current_user['_id']),
+            "room_id": room_oid,
+            "user_id": current_user['_id'],
             "user_name": current_user['full_name'],
             "content": data['content'],
             "message_type": data.get('message_type', 'text'),
             "is_edited": False,
             "is_deleted": False,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": g.now,
+            "updated_at": g.now
         }
         
         result = db.messages.insert_one(message)
@@ -244,6 +245,7 @@ def get_messages(room_id):
     try:
         if not ObjectId.is_valid(room_id):
             raise CustomHTTPException(400, "Invalid room ID format")
+        room_oid = ObjectId(room_id)
         
         current_user_email = get_jwt_identity()
         db = get_database()
@@ -254,12 +256,12 @@ def get_messages(room_id):
             raise CustomHTTPException(404, "User not found")
         
         # Get chat room
-        room = db.chat_rooms.find_one({"_id": ObjectId(room_id), "is_active": True})
+        room = db.chat_rooms.find_one({"_id": room_oid, "is_active": True})
         if not room:
             raise CustomHTTPException(404, "Chat room not found")
         
         # Check if user is a member
-        if ObjectId(current_user['_id']) not in room['members']:
+        if current_user['_id'] not in room['members']:
             raise CustomHTTPException(403, "You must be a member to view messages")
         
         # Get query parameters
@@ -268,7 +270,7 @@ def get_messages(room_id):
         
         # Build filter query
         filter_query = {
-            "room_id": ObjectId(room_id),
+            "room_id": room_oid,
             "is_deleted": False
         }
         
@@ -276,19 +278,12 @@ def get_messages(room_id):
             filter_query["_id"] = {"$lt": ObjectId(before_id)}
         
         # Get messages
-        messages_cursor = db.messages.find(filter_query).sort("created_at", -1).limit(limit)
-        messages = []
-        
-        for msg in messages_cursor:
-            msg['_id'] = str(msg['_id'])
-            msg['room_id'] = str(msg['room_id'])
-            msg['user_id'] = str(msg['user_id'])
-            messages.append(msg)
+        messages = list(db.messages.find(filter_query).sort("created_at", -1).limit(limit))
         
         # Reverse to get chronological order
         messages.reverse()
         
-        return jsonify({
+        return ojson({
             "messages": messages,
             "total_messages": len(messages),
             "room_id": room_id
@@ -321,29 +316,26 @@ def edit_message(message_id):
         if not current_user:
             raise CustomHTTPException(404, "User not found")
         
-        # Get message
-        message = db.messages.find_one({"_id": ObjectId(message_id), "is_deleted": False})
-        if not message:
-            raise CustomHTTPException(404, "Message not found")
+        message_oid = ObjectId(message_id)
         
-        # Check if user owns this message
-        if str(message['user_id']) != str(current_user['_id']):
-            raise CustomHTTPException(403, "You can only edit your own messages")
-        
-        # Update message
-        result = db.messages.update_one(
-            {"_id": ObjectId(message_id)},
+        # Update the message only if the caller owns it, in one round-trip
+        updated = db.messages.find_one_and_update(
+            {"_id": message_oid, "is_deleted": False, "user_id": current_user['_id']},
             {
                 "$set": {
                     "content": data['content'],
                     "is_edited": True,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": g.now
                 }
-            }
+            },
+            projection={"_id": 1}
         )
         
-        if result.modified_count == 0:
-            raise CustomHTTPException(400, "Failed to update message")
+        if updated is None:
+            # Only the failure path pays for a second lookup to pick the error
+            if db.messages.count_documents({"_id": message_oid, "is_deleted": False}, limit=1):
+                raise CustomHTTPException(403, "You can only edit your own messages")
+            raise CustomHTTPException(404, "Message not found")
         
         logger.info(f"Message {message_id} edited by user {current_user_email}")
         
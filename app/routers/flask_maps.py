@@ -3,20 +3,106 @@ Flask Maps Router
 Full maps and location functionality
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
-from datetime import datetime
+import re
+from itertools import chain
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
 from typing import Dict, Any
 
 from ..database import get_database
 from ..core.exceptions import CustomHTTPException
+from ..core.responses import ojson, ojson_stream
+from ..core.cache import cache_get, cache_set, NEARBY_SEARCH_CACHE_PREFIX
 
 logger = logging.getLogger(__name__)
 
 maps_bp = Blueprint('maps', __name__)
 
+# Text search relies on the weighted "loc_text" index created on connect (app.database.INDEXES)
+_TEXT_SCORE_PROJECTION = {"score": {"$meta": "textScore"}}
+_SORT_TEXT_SCORE = [("score", {"$meta": "textScore"})]
+_SORT_NAME = [("name", 1)]
+
+# Until the text index exists, $text fails with IndexNotFound; searches then
+# fall back to an escaped, case-insensitive substring match
+_INDEX_NOT_FOUND = 27
+_LIST_SEARCH_FIELDS = ("name", "description", "building")
+_SEARCH_FIELDS = ("name", "description", "building", "category")
+
+def _regex_search(search: str, fields) -> Dict[str, Any]:
+    """$or of case-insensitive substring matches for search over fields"""
+    pattern = {"$regex": re.escape(search), "$options": "i"}
+    return {"$or": [{field: pattern} for field in fields]}
+
+def _missing_text_index(error: OperationFailure) -> bool:
+    """Whether a query failed only because the text index does not exist yet"""
+    if error.code != _INDEX_NOT_FOUND:
+        return False
+    logger.warning(f"Text index missing, falling back to regex search: {error}")
+    return True
+
+# Nearby search bounds, matching NearbyRequest
+NEARBY_MIN_RADIUS_M = 100
+NEARBY_MAX_RADIUS_M = 10000
+NEARBY_MAX_LIMIT = 50
+NEARBY_SEARCH_CACHE_TTL = 120  # seconds
+
+# Stored location fields a client may request via ?fields=
+_LOCATION_FIELDS = frozenset({
+    "_id", "name", "category", "latitude", "longitude", "location", "description",
+    "address", "building", "floor", "room", "tags", "is_active", "visit_count",
+    "created_by", "created_at", "updated_at"
+})
+
+# Campus info statistics in one round trip: count, breakdowns and top locations
+MOST_VISITED_LIMIT = 5
+_CAMPUS_INFO_PIPELINE = [
+    {"$match": {"is_active": True}},
+    {"$facet": {
+        "total": [{"$count": "n"}],
+        "category_breakdown": [
+            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ],
+        "building_breakdown": [
+            {"$match": {"building": {"$exists": True, "$ne": ""}}},
+            {"$group": {"_id": "$building", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ],
+        "most_visited": [
+            {"$sort": {"visit_count": -1}},
+            {"$limit": MOST_VISITED_LIMIT},
+            {"$project": {"name": 1, "visit_count": 1, "category": 1, "_id": 0}}
+        ]
+    }}
+]
+
+# Admin checks only need the caller's id and role
+_ADMIN_CHECK_PROJECTION = {"_id": 1, "is_admin": 1}
+
+def _require_admin(db, current_user_email: str, message: str) -> dict:
+    """Load the caller's id and role, raising 403 unless they are an admin"""
+    current_user = db.users.find_one({"email": current_user_email}, _ADMIN_CHECK_PROJECTION)
+    if not current_user or not current_user.get('is_admin', False):
+        raise CustomHTTPException(403, message)
+    return current_user
+
+def _location_oid(location_id: str) -> ObjectId:
+    """Parse a location id once, raising 400 if it is malformed"""
+    try:
+        return ObjectId(location_id)
+    except (InvalidId, TypeError):
+        raise CustomHTTPException(400, "Invalid location ID format")
+
+def _geo_point(lat: float, lng: float) -> dict:
+    """GeoJSON point for the 2dsphere-indexed "location" field (lng first)"""
+    return {"type": "Point", "coordinates": [lng, lat]}
+
 @maps_bp.route('/locations', methods=['POST'])
 @jwt_required()
 def create_location():
@@ -34,9 +120,7 @@ def create_location():
         db = get_database()
         
         # Check if current user is admin
-        current_user = db.users.find_one({"email": current_user_email})
-        if not current_user or not current_user.get('is_admin', False):
-            raise CustomHTTPException(403, "Only admins can create locations")
+        current_user = _require_admin(db, current_user_email, "Only admins can create locations")
         
         # Validate coordinates
         try:
@@ -53,6 +137,7 @@ def create_location():
             "category": data['category'],
             "latitude": lat,
             "longitude": lng,
+            "location": _geo_point(lat, lng),
             "description": data['description'],
             "address": data.get('address', ''),
             "building": data.get('building', ''),
@@ -61,11 +146,15 @@ def create_location():
             "tags": data.get('tags', []),
             "is_active": True,
             "created_by": str(current_user['_id']),
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
+            "created_at": g.now,
+            "updated_at": g.now
         }
         
-        result = db.locations.insert_one(location_doc)
+        # The partial unique index on active coordinates rejects duplicates atomically
+        try:
+            result = db.locations.insert_one(location_doc)
+        except DuplicateKeyError:
+            raise CustomHTTPException(409, "A location already exists at these coordinates")
         location_doc['_id'] = str(result.inserted_id)
         
         logger.info(f"Location created: {data['name']} by admin {current_user_email}")
@@ -90,53 +179,135 @@ def get_locations():
         # Get query parameters
         category = request.args.get('category')
         search = request.args.get('search')
+        prefix = request.args.get('prefix', 'false').lower() == 'true'
         is_active = request.args.get('is_active', 'true').lower() == 'true'
+        fields = request.args.get('fields')
+        
+        # Build projection from requested fields
+        projection = None
+        if fields:
+            requested = [field.strip() for field in fields.split(',') if field.strip()]
+            unknown = [field for field in requested if field not in _LOCATION_FIELDS]
+            if unknown:
+                raise CustomHTTPException(400, f"Unknown fields: {', '.join(unknown)}")
+            projection = {field: 1 for field in requested}
         
         # Build filter query
         filter_query = {"is_active": is_active}
         
         if category:
             filter_query["category"] = category
-        if search:
-            filter_query["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"description": {"$regex": search, "$options": "i"}},
-                {"building": {"$regex": search, "$options": "i"}}
-            ]
+        if search and prefix:
+            # Anchored, case-sensitive prefix match can use the name index
+            filter_query["name"] = {"$regex": f"^{re.escape(search)}"}
+        
+        # Get locations; run the query before streaming so failures still surface as a 500
+        if search and not prefix:
+            text_query = {**filter_query, "$text": {"$search": search}}
+            text_projection = {**(projection or {}), **_TEXT_SCORE_PROJECTION}
+            try:
+                locations_cursor = db.locations.find(text_query, text_projection).sort(_SORT_TEXT_SCORE)
+                first = next(locations_cursor, None)
+            except OperationFailure as e:
+                if not _missing_text_index(e):
+                    raise
+                filter_query.update(_regex_search(search, _LIST_SEARCH_FIELDS))
+                locations_cursor = db.locations.find(filter_query, projection).sort(_SORT_NAME)
+                first = next(locations_cursor, None)
+        else:
+            locations_cursor = db.locations.find(filter_query, projection).sort(_SORT_NAME)
+            first = next(locations_cursor, None)
+        locations = chain((first,), locations_cursor) if first is not None else ()
+        
+        return ojson_stream(locations, "locations", count_key="total_count")
+        
+    except CustomHTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Get locations error: {e}")
+        raise CustomHTTPException(500, "Internal server error")
+
+@maps_bp.route('/nearby', methods=['GET'])
+def get_nearby_locations():
+    """Get active locations within a radius (meters), nearest first"""
+    try:
+        try:
+            lat = float(request.args['latitude'])
+            lng = float(request.args['longitude'])
+            radius = float(request.args.get('radius', 1000))
+            limit = int(request.args.get('limit', 20))
+        except (KeyError, ValueError):
+            raise CustomHTTPException(400, "latitude and longitude are required numbers")
+        
+        if not (-90 <= lat <= 90) or not (-180 <= lng <= 180):
+            raise CustomHTTPException(400, "Invalid latitude or longitude")
+        if not (NEARBY_MIN_RADIUS_M <= radius <= NEARBY_MAX_RADIUS_M):
+            raise CustomHTTPException(400, f"Radius must be between {NEARBY_MIN_RADIUS_M} and {NEARBY_MAX_RADIUS_M} meters")
+        if not (1 <= limit <= NEARBY_MAX_LIMIT):
+            raise CustomHTTPException(400, f"Limit must be between 1 and {NEARBY_MAX_LIMIT}")
         
-        # Get locations
-        locations_cursor = db.locations.find(filter_query).sort("name", 1)
-        locations = []
+        category = request.args.get('category')
         
-        for location in locations_cursor:
-            location['_id'] = str(location['_id'])
-            locations.append(location)
+        # Coordinates are rounded to ~11m so nearby callers share cache entries; the
+        # query runs on the rounded centre too, so a cached payload matches its key
+        lat, lng = round(lat, 4), round(lng, 4)
+        cache_key = f"{NEARBY_SEARCH_CACHE_PREFIX}{lat:.4f}:{lng:.4f}:{radius:g}:{category or '*'}:{limit}"
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return ojson(cached)
         
-        return jsonify({
+        db = get_database()
+        
+        filter_query = {"is_active": True}
+        if category:
+            filter_query["category"] = category
+        
+        # $geoNear filters, sorts and computes distance (meters) on the 2dsphere index
+        pipeline = [
+            {"$geoNear": {
+                "near": _geo_point(lat, lng),
+                "key": "location",
+                "distanceField": "distance",
+                "maxDistance": radius,
+                "spherical": True,
+                "query": filter_query
+            }},
+            {"$limit": limit}
+        ]
+        
+        locations = list(db.locations.aggregate(pipeline))
+        
+        payload = {
             "locations": locations,
-            "total_count": len(locations)
-        })
+            "center_lat": lat,
+            "center_lng": lng,
+            "radius": radius,
+            "total_found": len(locations)
+        }
+        # Short TTL instead of invalidation: location edits are rare and admin-only
+        cache_set(cache_key, payload, NEARBY_SEARCH_CACHE_TTL)
         
+        return ojson(payload)
+        
+    except CustomHTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Get locations error: {e}")
+        logger.error(f"Get nearby locations error: {e}")
         raise CustomHTTPException(500, "Internal server error")
 
 @maps_bp.route('/locations/<location_id>', methods=['GET'])
 def get_location(location_id):
     """Get specific location by ID"""
     try:
-        if not ObjectId.is_valid(location_id):
-            raise CustomHTTPException(400, "Invalid location ID format")
+        location_oid = _location_oid(location_id)
         
         db = get_database()
         
-        location = db.locations.find_one({"_id": ObjectId(location_id)})
+        location = db.locations.find_one({"_id": location_oid})
         if not location:
             raise CustomHTTPException(404, "Location not found")
         
-        location['_id'] = str(location['_id'])
-        
-        return jsonify(location)
+        return ojson(location)
         
     except CustomHTTPException:
         raise
@@ -149,8 +320,7 @@ def get_location(location_id):
 def update_location(location_id):
     """Update location (admin only)"""
     try:
-        if not ObjectId.is_valid(location_id):
-            raise CustomHTTPException(400, "Invalid location ID format")
+        location_oid = _location_oid(location_id)
         
         current_user_email = get_jwt_identity()
         data = request.get_json()
@@ -161,9 +331,7 @@ def update_location(location_id):
         db = get_database()
         
         # Check if current user is admin
-        current_user = db.users.find_one({"email": current_user_email})
-        if not current_user or not current_user.get('is_admin', False):
-            raise CustomHTTPException(403, "Only admins can update locations")
+        _require_admin(db, current_user_email, "Only admins can update locations")
         
         # Fields that can be updated
         allowed_fields = ['name', 'category', 'latitude', 'longitude', 'description', 'address', 'building', 'floor', 'room', 'tags', 'is_active']
@@ -187,21 +355,41 @@ def update_location(location_id):
         if not update_data:
             raise CustomHTTPException(400, "No valid fields to update")
         
-        update_data['updated_at'] = datetime.utcnow()
+        update_data['updated_at'] = g.now
+        
+        # Keep the GeoJSON point in sync with the coordinates
+        if 'latitude' in update_data and 'longitude' in update_data:
+            update_data['location'] = _geo_point(update_data['latitude'], update_data['longitude'])
+            update = {"$set": update_data}
+        elif 'latitude' in update_data or 'longitude' in update_data:
+            # Only one coordinate changed; rebuild the point from the stored one server-side
+            update = [
+                {"$set": {field: {"$literal": value} for field, value in update_data.items()}},
+                {"$set": {"location": {"type": "Point", "coordinates": ["$longitude", "$latitude"]}}}
+            ]
+        else:
+            update = {"$set": update_data}
         
-        # Update location
-        result = db.locations.update_one(
-            {"_id": ObjectId(location_id)},
-            {"$set": update_data}
-        )
+        # Update location and read back the result in one round-trip
+        try:
+            updated_location = db.locations.find_one_and_update(
+                {"_id": location_oid},
+                update,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            raise CustomHTTPException(409, "A location already exists at these coordinates")
+        
+        if updated_location is None:
+            raise CustomHTTPException(404, "Location not found")
         
-        if result.modified_count == 0:
-            raise CustomHTTPException(400, "No changes made")
+        updated_location['_id'] = str(updated_location['_id'])
         
         logger.info(f"Location updated: {location_id} by admin {current_user_email}")
         
         return jsonify({
-            "message": "Location updated successfully"
+            "message": "Location updated successfully",
+            "location": updated_location
         })
         
     except CustomHTTPException:
@@ -215,19 +403,16 @@ def update_location(location_id):
 def delete_location(location_id):
     """Delete location (admin only)"""
     try:
-        if not ObjectId.is_valid(location_id):
-            raise CustomHTTPException(400, "Invalid location ID format")
+        location_oid = _location_oid(location_id)
         
         current_user_email = get_jwt_identity()
         db = get_database()
         
         # Check if current user is admin
-        current_user = db.users.find_one({"email": current_user_email})
-        if not current_user or not current_user.get('is_admin', False):
-            raise CustomHTTPException(403, "Only admins can delete locations")
+        _require_admin(db, current_user_email, "Only admins can delete locations")
         
         # Delete location
-        result = db.locations.delete_one({"_id": ObjectId(location_id)})
+        result = db.locations.delete_one({"_id": location_oid})
         
         if result.deleted_count == 0:
             raise CustomHTTPException(404, "Location not found")
@@ -253,7 +438,7 @@ def get_categories():
         # Get unique categories
         categories = db.locations.distinct("category")
         
-        return jsonify({
+        return ojson({
             "categories": categories
         })
         
@@ -268,28 +453,14 @@ def get_campus_info():
         db = get_database()
         
         # Get campus statistics
-        total_locations = db.locations.count_documents({"is_active": True})
-        
-        # Get category breakdown
-        category_pipeline = [
-            {"$match": {"is_active": True}},
-            {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        category_breakdown = list(db.locations.aggregate(category_pipeline))
-        
-        # Get building breakdown
-        building_pipeline = [
-            {"$match": {"is_active": True, "building": {"$exists": True, "$ne": ""}}},
-            {"$group": {"_id": "$building", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        building_breakdown = list(db.locations.aggregate(building_pipeline))
-        
-        return jsonify({
-            "total_locations": total_locations,
-            "category_breakdown": category_breakdown,
-            "building_breakdown": building_breakdown,
+        stats = next(db.locations.aggregate(_CAMPUS_INFO_PIPELINE), {})
+        total = stats.get("total") or [{"n": 0}]
+        
+        return ojson({
+            "total_locations": total[0]["n"],
+            "category_breakdown": stats.get("category_breakdown", []),
+            "building_breakdown": stats.get("building_breakdown", []),
+            "most_visited": stats.get("most_visited", []),
             "campus_name": "Babcock University",
             "description": "Smart Campus with comprehensive location services"
         })
@@ -308,27 +479,27 @@ def search_locations():
         
         db = get_database()
         
-        # Build search query
+        # Build search query against the locations text index
         search_query = {
             "is_active": True,
-            "$or": [
-                {"name": {"$regex": query, "$options": "i"}},
-                {"description": {"$regex": query, "$options": "i"}},
-                {"building": {"$regex": query, "$options": "i"}},
-                {"category": {"$regex": query, "$options": "i"}},
-                {"tags": {"$in": [query]}}
-            ]
+            "$text": {"$search": query}
         }
         
-        # Get search results
-        locations_cursor = db.locations.find(search_query).limit(20)
-        locations = []
-        
-        for location in locations_cursor:
-            location['_id'] = str(location['_id'])
-            locations.append(location)
-        
-        return jsonify({
+        # Get search results, best matches first
+        try:
+            locations = list(
+                db.locations.find(search_query, _TEXT_SCORE_PROJECTION)
+                .sort(_SORT_TEXT_SCORE)
+                .limit(20)
+            )
+        except OperationFailure as e:
+            if not _missing_text_index(e):
+                raise
+            fallback_query = {"is_active": True, **_regex_search(query, _SEARCH_FIELDS)}
+            fallback_query["$or"].append({"tags": query})
+            locations = list(db.locations.find(fallback_query).limit(20))
+        
+        return ojson({
             "query": query,
             "results": locations,
             "total_results": len(locations)
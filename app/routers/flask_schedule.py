@@ -3,19 +3,109 @@ Flask Schedule Router
 Basic schedule management functionality
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, Response, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import logging
-from datetime import datetime, timedelta
+import hashlib
+from datetime import datetime, timedelta, time
+from typing import Dict, Optional, Tuple
 from bson import ObjectId
 
 from ..database import get_database
 from ..core.exceptions import CustomHTTPException
+from ..core.utils import parse_date
+from ..core.responses import ojson
+from ..core.cache import cache_get_many, cache_set_many, INSTRUCTOR_NAME_CACHE_PREFIX
 
 logger = logging.getLogger(__name__)
 
 schedule_bp = Blueprint('schedule', __name__)
 
+# Shared query documents, built once instead of per request
+_USER_SCOPE_PROJECTION = {"department": 1, "level": 1}
+_SORT_DATE = [("date", 1)]
+_SORT_START = [("start_time", 1)]
+
+# Cursor tuning: larger batches amortize round-trips, maxTimeMS bounds slow queries
+_SCHEDULE_BATCH_SIZE = 256
+_SCHEDULE_MAX_TIME_MS = 3000
+
+_INSTRUCTOR_NAME_PROJECTION = {"full_name": 1}
+INSTRUCTOR_NAME_CACHE_TTL = 3600  # seconds
+
+# Scope fingerprint for ETags: size, active size, newest update, and the
+# instructors whose names get filled in from the users collection
+_ETAG_GROUP = {"$group": {
+    "_id": None,
+    "count": {"$sum": 1},
+    "active": {"$sum": {"$cond": [{"$eq": ["$is_active", True]}, 1, 0]}},
+    "latest": {"$max": "$updated_at"},
+    "instructor_ids": {"$addToSet": {
+        "$cond": [{"$not": ["$instructor_name"]}, "$instructor_id", "$$REMOVE"]
+    }}
+}}
+
+def _instructor_names(db, instructor_ids) -> Dict[str, Optional[str]]:
+    """Look up instructor display names, cached and batched"""
+    missing_ids = list(instructor_ids)
+    if not missing_ids:
+        return {}
+    
+    cached = cache_get_many([INSTRUCTOR_NAME_CACHE_PREFIX + i for i in missing_ids])
+    names = {i: name for i, name in zip(missing_ids, cached) if name is not None}
+    
+    to_fetch = [ObjectId(i) for i in missing_ids if i not in names and ObjectId.is_valid(i)]
+    if to_fetch:
+        fetched = {
+            str(user['_id']): user.get('full_name')
+            for user in db.users.find({"_id": {"$in": to_fetch}}, _INSTRUCTOR_NAME_PROJECTION)
+        }
+        names.update(fetched)
+        cache_set_many(
+            {INSTRUCTOR_NAME_CACHE_PREFIX + i: name for i, name in fetched.items()},
+            INSTRUCTOR_NAME_CACHE_TTL
+        )
+    return names
+
+def _schedule_etag(db, filter_query) -> Tuple[str, Dict[str, Optional[str]]]:
+    """Build an ETag for the requested scope, returning the instructor names it covers"""
+    # Ignore is_active so deactivating a class also changes the tag
+    scope = {k: v for k, v in filter_query.items() if k != "is_active"}
+    stats = next(
+        db.classes.aggregate([{"$match": scope}, _ETAG_GROUP], maxTimeMS=_SCHEDULE_MAX_TIME_MS), None
+    ) or {}
+    latest = stats.get('latest')
+    stamp = latest.timestamp() if isinstance(latest, datetime) else 0
+    
+    # Names are embedded in the body, so renaming an instructor must change the tag too
+    names = _instructor_names(db, {str(i) for i in stats.get('instructor_ids', ()) if i})
+    fingerprint = (scope, stats.get('count', 0), stats.get('active', 0), stamp, sorted(names.items()))
+    return hashlib.sha1(repr(fingerprint).encode()).hexdigest(), names
+
+def _not_modified(etag: str) -> Response:
+    """Empty 304 response for a matching If-None-Match"""
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+def _attach_instructor_names(db, classes, names: Dict[str, Optional[str]]):
+    """Fill in missing instructor names, looking up any not already in names"""
+    missing = {
+        str(class_data['instructor_id'])
+        for class_data in classes
+        if not class_data.get('instructor_name') and class_data.get('instructor_id')
+    }
+    if not missing:
+        return
+    
+    unknown = missing - names.keys()
+    if unknown:
+        names = {**names, **_instructor_names(db, unknown)}
+    
+    for class_data in classes:
+        if not class_data.get('instructor_name') and class_data.get('instructor_id'):
+            class_data['instructor_name'] = names.get(str(class_data['instructor_id']))
+
 @schedule_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_schedule():
@@ -25,7 +115,7 @@ def get_schedule():
         db = get_database()
         
         # Get current user
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _USER_SCOPE_PROJECTION)
         if not current_user:
             raise CustomHTTPException(404, "User not found")
         
@@ -44,31 +134,35 @@ def get_schedule():
             date_filter = {}
             if start_date:
                 try:
-                    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+                    start_dt = parse_date(start_date)
                     date_filter["$gte"] = start_dt
                 except ValueError:
                     raise CustomHTTPException(400, "Invalid start date format. Use YYYY-MM-DD")
             if end_date:
                 try:
-                    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+                    end_dt = parse_date(end_date)
                     date_filter["$lte"] = end_dt
                 except ValueError:
                     raise CustomHTTPException(400, "Invalid end date format. Use YYYY-MM-DD")
             filter_query["date"] = date_filter
         
-        # Get classes
-        classes_cursor = db.classes.find(filter_query).sort("date", 1)
-        schedule = []
+        etag, instructor_names = _schedule_etag(db, filter_query)
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
         
-        for class_data in classes_cursor:
-            class_data['_id'] = str(class_data['_id'])
-            class_data['instructor_id'] = str(class_data['instructor_id'])
-            schedule.append(class_data)
+        # Get classes
+        schedule = list(
+            db.classes.find(filter_query).sort(_SORT_DATE)
+            .batch_size(_SCHEDULE_BATCH_SIZE).max_time_ms(_SCHEDULE_MAX_TIME_MS)
+        )
+        _attach_instructor_names(db, schedule, instructor_names)
         
-        return jsonify({
+        response = ojson({
             "schedule": schedule,
             "total_classes": len(schedule)
         })
+        response.set_etag(etag)
+        return response
         
     except CustomHTTPException:
         raise
@@ -85,33 +179,44 @@ def get_today_schedule():
         db = get_database()
         
         # Get current user
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _USER_SCOPE_PROJECTION)
         if not current_user:
             raise CustomHTTPException(404, "User not found")
         
-        today = datetime.utcnow().date()
+        today = g.now.date()
+        
+        # Class dates are stored as BSON datetimes, so match the whole day as a range
+        day_start = datetime.combine(today, time.min)
+        day_end = day_start + timedelta(days=1)
         
         # Get today's classes
         filter_query = {
             "department": current_user["department"],
             "level": current_user["level"],
-            "date": today,
+            "date": {
+                "$gte": day_start,
+                "$lt": day_end
+            },
             "is_active": True
         }
         
-        classes_cursor = db.classes.find(filter_query).sort("start_time", 1)
-        today_schedule = []
+        etag, instructor_names = _schedule_etag(db, filter_query)
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
         
-        for class_data in classes_cursor:
-            class_data['_id'] = str(class_data['_id'])
-            class_data['instructor_id'] = str(class_data['instructor_id'])
-            today_schedule.append(class_data)
+        today_schedule = list(
+            db.classes.find(filter_query).sort(_SORT_START)
+            .batch_size(_SCHEDULE_BATCH_SIZE).max_time_ms(_SCHEDULE_MAX_TIME_MS)
+        )
+        _attach_instructor_names(db, today_schedule, instructor_names)
         
-        return jsonify({
+        response = ojson({
             "date": today.isoformat(),
             "schedule": today_schedule,
             "total_classes": len(today_schedule)
         })
+        response.set_etag(etag)
+        return response
         
     except CustomHTTPException:
         raise
@@ -128,39 +233,43 @@ def get_week_schedule():
         db = get_database()
         
         # Get current user
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _USER_SCOPE_PROJECTION)
         if not current_user:
             raise CustomHTTPException(404, "User not found")
         
-        today = datetime.utcnow().date()
+        today = g.now.date()
         week_start = today - timedelta(days=today.weekday())
         week_end = week_start + timedelta(days=6)
         
-        # Get this week's classes
+        # Get this week's classes (datetime bounds, end exclusive at the next day)
         filter_query = {
             "department": current_user["department"],
             "level": current_user["level"],
             "date": {
-                "$gte": week_start,
-                "$lte": week_end
+                "$gte": datetime.combine(week_start, time.min),
+                "$lt": datetime.combine(week_end + timedelta(days=1), time.min)
             },
             "is_active": True
         }
         
-        classes_cursor = db.classes.find(filter_query).sort("date", 1)
-        week_schedule = []
+        etag, instructor_names = _schedule_etag(db, filter_query)
+        if request.if_none_match.contains(etag):
+            return _not_modified(etag)
         
-        for class_data in classes_cursor:
-            class_data['_id'] = str(class_data['_id'])
-            class_data['instructor_id'] = str(class_data['instructor_id'])
-            week_schedule.append(class_data)
+        week_schedule = list(
+            db.classes.find(filter_query).sort(_SORT_DATE)
+            .batch_size(_SCHEDULE_BATCH_SIZE).max_time_ms(_SCHEDULE_MAX_TIME_MS)
+        )
+        _attach_instructor_names(db, week_schedule, instructor_names)
         
-        return jsonify({
+        response = ojson({
             "week_start": week_start.isoformat(),
             "week_end": week_end.isoformat(),
             "schedule": week_schedule,
             "total_classes": len(week_schedule)
         })
+        response.set_etag(etag)
+        return response
         
     except CustomHTTPException:
         raise
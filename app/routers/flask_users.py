@@ -3,21 +3,165 @@ Flask Users Router
 Full user management functionality
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, g
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+import base64
+import hashlib
+import hmac
 import logging
-from datetime import datetime
+import re
+from concurrent.futures import ThreadPoolExecutor
 from bson import ObjectId
+from bson.errors import InvalidId
+import orjson
+from pymongo import ReturnDocument
+from pymongo.errors import ExecutionTimeout
 from typing import Dict, Any
 
 from ..database import get_database
+from ..core.config import settings
 from ..core.exceptions import CustomHTTPException
+from ..core.responses import ojson, ndjson_stream
+from ..core.passwords import hash_password_bounded, verify_password_bounded
+from ..core.cache import (
+    cache_get, cache_set, cache_delete, cache_incr,
+    USER_STATS_CACHE_KEY, INSTRUCTOR_NAME_CACHE_PREFIX, USER_COUNT_CACHE_PREFIX, USER_COUNT_VERSION_KEY
+)
 
 logger = logging.getLogger(__name__)
 
 users_bp = Blueprint('users', __name__)
 
+# Shared query documents, built once instead of per request
+_ADMIN_PROJECTION = {"_id": 1, "is_admin": 1, "department": 1, "level": 1}
+# Single-user reads hide the password hash and the internal search key
+_USER_DETAIL_PROJECTION = {"password_hash": 0, "full_name_lc": 0}
+
+# Listing rows carry only what the admin table shows
+USER_LIST_PROJECTION = {
+    "full_name": 1, "student_id": 1, "email": 1, "department": 1, "level": 1,
+    "is_active": 1, "is_admin": 1, "is_instructor": 1, "created_at": 1
+}
+
+def _count_if(condition):
+    """Aggregation accumulator counting documents that match condition"""
+    return {"$sum": {"$cond": [condition, 1, 0]}}
+
+# Totals and both breakdowns computed in one $facet pass over users
+_USER_STATS_PIPELINE = [
+    {"$facet": {
+        "totals": [
+            {"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "active": _count_if({"$eq": ["$is_active", True]}),
+                "inactive": _count_if({"$eq": ["$is_active", False]}),
+                "admins": _count_if({"$eq": ["$is_admin", True]})
+            }}
+        ],
+        "department_breakdown": [
+            {"$group": {"_id": "$department", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ],
+        "level_breakdown": [
+            {"$group": {"_id": "$level", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}}
+        ]
+    }}
+]
+
+# Upper bound on list queries so a slow scan can't hog a worker
+_LIST_MAX_TIME_MS = 2000
+_COUNT_MAX_TIME_MS = 5000
+
+# Filtered counts are shared across pages of the same listing
+USER_COUNT_CACHE_TTL = 45  # seconds
+
+def _cached_user_count(db, filter_query: Dict[str, Any]) -> int:
+    """Count users matching filter_query, cached per filter and user-count generation"""
+    version = cache_get(USER_COUNT_VERSION_KEY) or 0
+    digest = hashlib.blake2b(
+        orjson.dumps(filter_query, default=str, option=orjson.OPT_SORT_KEYS), digest_size=16
+    ).hexdigest()
+    cache_key = f"{USER_COUNT_CACHE_PREFIX}v{version}:{digest}"
+    
+    total_count = cache_get(cache_key)
+    if total_count is None:
+        total_count = db.users.count_documents(filter_query, maxTimeMS=_COUNT_MAX_TIME_MS)
+        cache_set(cache_key, total_count, USER_COUNT_CACHE_TTL)
+    return total_count
+
+def _user_listing_total(db, filter_query: Dict[str, Any]):
+    """Total for a user listing, or None when an exact count times out"""
+    try:
+        if filter_query:
+            return _cached_user_count(db, filter_query)
+        # Unfiltered listings read collection metadata instead of counting
+        return db.users.estimated_document_count()
+    except ExecutionTimeout:
+        return None
+
+# Listing counts run alongside the page fetch; pymongo clients are thread-safe
+_COUNT_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="user-count")
+
+# User listings page by (full_name, _id), backed by the matching index
+_SORT_USERS = [("full_name", 1), ("_id", 1)]
+
+def _user_oid(user_id: str) -> ObjectId:
+    """Parse a user id once, raising 400 if it is malformed"""
+    try:
+        return ObjectId(user_id)
+    except (InvalidId, TypeError):
+        raise CustomHTTPException(400, "Invalid user ID format")
+
+def _user_listing_filter(department, level, is_active, search: str, text: str = '') -> Dict[str, Any]:
+    """Build the users filter shared by the paged listing and the export
+
+    ``search`` is a name prefix at every length, for type-ahead; ``text`` is an
+    explicit whole-word search over the users_text index.
+    """
+    filter_query = {}
+    if department:
+        filter_query["department"] = department
+    if level:
+        filter_query["level"] = level
+    if is_active is not None:
+        filter_query["is_active"] = is_active.lower() == 'true'
+    if search:
+        # An anchored, escaped regex on the lowercased copy is case-insensitive
+        # and still a range scan on its index
+        filter_query["full_name_lc"] = {"$regex": f"^{re.escape(search.lower())}"}
+    if text:
+        filter_query["$text"] = {"$search": text}
+    return filter_query
+
+# Cursors are signed so clients can only echo back positions the server issued
+_CURSOR_SIG_BYTES = 8
+
+def _sign_cursor(payload: bytes) -> bytes:
+    """Truncated HMAC-SHA256 of a cursor payload"""
+    return hmac.new(settings.SECRET_KEY.encode(), payload, hashlib.sha256).digest()[:_CURSOR_SIG_BYTES]
+
+def _encode_users_cursor(full_name: str, user_oid: ObjectId) -> str:
+    """Opaque, signed keyset cursor for the next users page"""
+    payload = f"{full_name}|{user_oid}".encode()
+    return base64.urlsafe_b64encode(_sign_cursor(payload) + payload).decode()
+
+def _decode_users_cursor(after: str):
+    """Verify and decode an ``after`` cursor into (full_name, ObjectId), raising 400 if invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(after.encode())
+        signature, payload = raw[:_CURSOR_SIG_BYTES], raw[_CURSOR_SIG_BYTES:]
+        if not hmac.compare_digest(signature, _sign_cursor(payload)):
+            raise ValueError("bad cursor signature")
+        full_name, _, user_id = payload.decode().rpartition("|")
+        return full_name, ObjectId(user_id)
+    except (ValueError, InvalidId):
+        raise CustomHTTPException(400, "Invalid pagination cursor")
+
+# Admin dashboard stats are polled frequently; cache briefly and invalidate on writes
+USER_STATS_CACHE_TTL = 30  # seconds
+
 @users_bp.route('/', methods=['GET'])
 @jwt_required()
 def get_users():
@@ -27,7 +171,7 @@ def get_users():
         db = get_database()
         
         # Check if current user is admin
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _ADMIN_PROJECTION)
         if not current_user or not current_user.get('is_admin', False):
             raise CustomHTTPException(403, "Insufficient privileges")
         
@@ -37,35 +181,52 @@ def get_users():
         department = request.args.get('department')
         level = request.args.get('level')
         is_active = request.args.get('is_active')
+        after = request.args.get('after')
+        search = request.args.get('search', '').strip()
+        text = request.args.get('text', '').strip()
+        
+        filter_query = _user_listing_filter(department, level, is_active, search, text)
+        
+        # Count on the pool while this thread fetches the page
+        count_future = _COUNT_POOL.submit(_user_listing_total, db, filter_query)
+        
+        # Seek past the last (full_name, _id) seen instead of skipping
+        page_query = filter_query
+        if after:
+            last_name, last_oid = _decode_users_cursor(after)
+            page_query = {
+                **filter_query,
+                "$or": [
+                    {"full_name": {"$gt": last_name}},
+                    {"full_name": last_name, "_id": {"$gt": last_oid}}
+                ]
+            }
+            skip = 0
+        
+        # Get users with pagination, listing fields only; one extra row detects more pages
+        users = list(
+            db.users.find(page_query, USER_LIST_PROJECTION)
+            .sort(_SORT_USERS)
+            .skip(skip).limit(limit + 1)
+            .batch_size(limit + 1)  # fetch the whole page in the first batch
+            .max_time_ms(_LIST_MAX_TIME_MS)
+        )
+        has_more = len(users) > limit
+        users = users[:limit]
+        total_count = count_future.result()
         
-        # Build filter query
-        filter_query = {}
-        if department:
-            filter_query["department"] = department
-        if level:
-            filter_query["level"] = level
-        if is_active is not None:
-            filter_query["is_active"] = is_active.lower() == 'true'
-        
-        # Get total count
-        total_count = db.users.count_documents(filter_query)
-        
-        # Get users with pagination
-        users_cursor = db.users.find(filter_query).skip(skip).limit(limit)
-        users = []
-        
-        for user in users_cursor:
-            user['_id'] = str(user['_id'])
-            user.pop('password_hash', None)  # Remove sensitive data
-            users.append(user)
+        next_cursor = None
+        if has_more and users:
+            next_cursor = _encode_users_cursor(users[-1].get('full_name', ''), users[-1]['_id'])
         
-        return jsonify({
+        return ojson({
             "users": users,
             "total_count": total_count,
             "pagination": {
                 "skip": skip,
                 "limit": limit,
-                "has_more": skip + limit < total_count
+                "has_more": has_more,
+                "next_cursor": next_cursor
             }
         })
         
@@ -75,34 +236,62 @@ def get_users():
         logger.error(f"Get users error: {e}")
         raise CustomHTTPException(500, "Internal server error")
 
+@users_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_users():
+    """Stream every matching user as NDJSON (admin only)"""
+    try:
+        current_user_email = get_jwt_identity()
+        db = get_database()
+        
+        # Check if current user is admin
+        current_user = db.users.find_one({"email": current_user_email}, _ADMIN_PROJECTION)
+        if not current_user or not current_user.get('is_admin', False):
+            raise CustomHTTPException(403, "Insufficient privileges")
+        
+        filter_query = _user_listing_filter(
+            request.args.get('department'),
+            request.args.get('level'),
+            request.args.get('is_active'),
+            request.args.get('search', '').strip(),
+            request.args.get('text', '').strip()
+        )
+        
+        # One line per user, written as the cursor yields it
+        cursor = db.users.find(filter_query, USER_LIST_PROJECTION).sort(_SORT_USERS)
+        return ndjson_stream(cursor)
+        
+    except CustomHTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Export users error: {e}")
+        raise CustomHTTPException(500, "Internal server error")
+
 @users_bp.route('/<user_id>', methods=['GET'])
 @jwt_required()
 def get_user(user_id):
     """Get specific user by ID"""
     try:
-        if not ObjectId.is_valid(user_id):
-            raise CustomHTTPException(400, "Invalid user ID format")
+        user_oid = _user_oid(user_id)
         
         current_user_email = get_jwt_identity()
         db = get_database()
         
         # Check if current user is admin or requesting their own profile
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _ADMIN_PROJECTION)
         if not current_user:
             raise CustomHTTPException(404, "Current user not found")
         
         # Allow users to view their own profile or admins to view any profile
-        if not current_user.get('is_admin', False) and current_user_email != user_id:
+        if not current_user.get('is_admin', False) and current_user['_id'] != user_oid:
             raise CustomHTTPException(403, "Insufficient privileges")
         
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = db.users.find_one({"_id": user_oid}, _USER_DETAIL_PROJECTION)
         if not user:
             raise CustomHTTPException(404, "User not found")
         
-        user['_id'] = str(user['_id'])
-        user.pop('password_hash', None)  # Remove sensitive data
         
-        return jsonify(user)
+        return ojson(user)
         
     except CustomHTTPException:
         raise
@@ -123,11 +312,6 @@ def update_profile():
         
         db = get_database()
         
-        # Get current user
-        current_user = db.users.find_one({"email": current_user_email})
-        if not current_user:
-            raise CustomHTTPException(404, "User not found")
-        
         # Fields that can be updated
         allowed_fields = ['full_name', 'department', 'level']
         update_data = {}
@@ -139,25 +323,30 @@ def update_profile():
         if not update_data:
             raise CustomHTTPException(400, "No valid fields to update")
         
-        update_data['updated_at'] = datetime.utcnow()
+        if 'full_name' in update_data:
+            if not isinstance(update_data['full_name'], str):
+                raise CustomHTTPException(400, "full_name must be a string")
+            update_data['full_name_lc'] = update_data['full_name'].lower()
         
-        # Update user
-        result = db.users.update_one(
+        update_data['updated_at'] = g.now
+        
+        # Update user and read back the result in one round-trip
+        updated_user = db.users.find_one_and_update(
             {"email": current_user_email},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection=_USER_DETAIL_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count == 0:
-            raise CustomHTTPException(400, "No changes made")
+        if updated_user is None:
+            raise CustomHTTPException(404, "User not found")
         
-        # Get updated user
-        updated_user = db.users.find_one({"email": current_user_email})
-        updated_user['_id'] = str(updated_user['_id'])
-        updated_user.pop('password_hash', None)
+        cache_delete(USER_STATS_CACHE_KEY, INSTRUCTOR_NAME_CACHE_PREFIX + str(updated_user['_id']))
+        cache_incr(USER_COUNT_VERSION_KEY)
         
         logger.info(f"Profile updated: {current_user_email}")
         
-        return jsonify({
+        return ojson({
             "message": "Profile updated successfully",
             "user": updated_user
         })
@@ -187,11 +376,11 @@ def change_password():
             raise CustomHTTPException(404, "User not found")
         
         # Verify current password
-        if not check_password_hash(current_user['password_hash'], data['current_password']):
+        if not verify_password_bounded(data['current_password'], current_user['password_hash']):
             raise CustomHTTPException(400, "Current password is incorrect")
         
         # Hash new password
-        new_password_hash = generate_password_hash(data['new_password'])
+        new_password_hash = hash_password_bounded(data['new_password'])
         
         # Update password
         result = db.users.update_one(
@@ -199,7 +388,7 @@ def change_password():
             {
                 "$set": {
                     "password_hash": new_password_hash,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": g.now
                 }
             }
         )
@@ -209,7 +398,7 @@ def change_password():
         
         logger.info(f"Password changed: {current_user_email}")
         
-        return jsonify({
+        return ojson({
             "message": "Password changed successfully"
         })
         
@@ -224,8 +413,7 @@ def change_password():
 def update_user(user_id):
     """Update user (admin only)"""
     try:
-        if not ObjectId.is_valid(user_id):
-            raise CustomHTTPException(400, "Invalid user ID format")
+        user_oid = _user_oid(user_id)
         
         current_user_email = get_jwt_identity()
         data = request.get_json()
@@ -236,7 +424,7 @@ def update_user(user_id):
         db = get_database()
         
         # Check if current user is admin
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _ADMIN_PROJECTION)
         if not current_user or not current_user.get('is_admin', False):
             raise CustomHTTPException(403, "Insufficient privileges")
         
@@ -251,21 +439,32 @@ def update_user(user_id):
         if not update_data:
             raise CustomHTTPException(400, "No valid fields to update")
         
-        update_data['updated_at'] = datetime.utcnow()
+        if 'full_name' in update_data:
+            if not isinstance(update_data['full_name'], str):
+                raise CustomHTTPException(400, "full_name must be a string")
+            update_data['full_name_lc'] = update_data['full_name'].lower()
         
-        # Update user
-        result = db.users.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+        update_data['updated_at'] = g.now
+        
+        # Update user and read back the result in one round-trip
+        updated_user = db.users.find_one_and_update(
+            {"_id": user_oid},
+            {"$set": update_data},
+            projection=_USER_DETAIL_PROJECTION,
+            return_document=ReturnDocument.AFTER
         )
         
-        if result.modified_count == 0:
-            raise CustomHTTPException(400, "No changes made")
+        if updated_user is None:
+            raise CustomHTTPException(404, "User not found")
+        
+        cache_delete(USER_STATS_CACHE_KEY, INSTRUCTOR_NAME_CACHE_PREFIX + str(user_oid))
+        cache_incr(USER_COUNT_VERSION_KEY)
         
         logger.info(f"User updated by admin: {user_id}")
         
-        return jsonify({
-            "message": "User updated successfully"
+        return ojson({
+            "message": "User updated successfully",
+            "user": updated_user
         })
         
     except CustomHTTPException:
@@ -279,30 +478,32 @@ def update_user(user_id):
 def delete_user(user_id):
     """Delete user (admin only)"""
     try:
-        if not ObjectId.is_valid(user_id):
-            raise CustomHTTPException(400, "Invalid user ID format")
+        user_oid = _user_oid(user_id)
         
         current_user_email = get_jwt_identity()
         db = get_database()
         
         # Check if current user is admin
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _ADMIN_PROJECTION)
         if not current_user or not current_user.get('is_admin', False):
             raise CustomHTTPException(403, "Insufficient privileges")
         
         # Prevent admin from deleting themselves
-        if current_user['_id'] == ObjectId(user_id):
+        if current_user['_id'] == user_oid:
             raise CustomHTTPException(400, "Cannot delete your own account")
         
         # Delete user
-        result = db.users.delete_one({"_id": ObjectId(user_id)})
+        result = db.users.delete_one({"_id": user_oid})
         
         if result.deleted_count == 0:
             raise CustomHTTPException(404, "User not found")
         
+        cache_delete(USER_STATS_CACHE_KEY, INSTRUCTOR_NAME_CACHE_PREFIX + str(user_oid))
+        cache_incr(USER_COUNT_VERSION_KEY)
+        
         logger.info(f"User deleted by admin: {user_id}")
         
-        return jsonify({
+        return ojson({
             "message": "User deleted successfully"
         })
         
@@ -321,38 +522,36 @@ def get_user_stats():
         db = get_database()
         
         # Check if current user is admin
-        current_user = db.users.find_one({"email": current_user_email})
+        current_user = db.users.find_one({"email": current_user_email}, _ADMIN_PROJECTION)
         if not current_user or not current_user.get('is_admin', False):
             raise CustomHTTPException(403, "Insufficient privileges")
         
-        # Get statistics
-        total_users = db.users.count_documents({})
-        active_users = db.users.count_documents({"is_active": True})
-        inactive_users = db.users.count_documents({"is_active": False})
-        admin_users = db.users.count_documents({"is_admin": True})
+        cached_stats = cache_get(USER_STATS_CACHE_KEY)
+        if cached_stats is not None:
+            return ojson(cached_stats)
         
-        # Department breakdown
-        dept_pipeline = [
-            {"$group": {"_id": "$department", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        dept_breakdown = list(db.users.aggregate(dept_pipeline))
+        # Get all statistics in a single aggregation round-trip
+        result = next(db.users.aggregate(_USER_STATS_PIPELINE, allowDiskUse=False), {})
+        totals = result["totals"][0] if result.get("totals") else {}
         
-        # Level breakdown
-        level_pipeline = [
-            {"$group": {"_id": "$level", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}}
-        ]
-        level_breakdown = list(db.users.aggregate(level_pipeline))
+        total_users = totals.get("total", 0)
+        active_users = totals.get("active", 0)
+        inactive_users = totals.get("inactive", 0)
+        admin_users = totals.get("admins", 0)
+        dept_breakdown = result.get("department_breakdown", [])
+        level_breakdown = result.get("level_breakdown", [])
         
-        return jsonify({
+        stats = {
             "total_users": total_users,
             "active_users": active_users,
             "inactive_users": inactive_users,
             "admin_users": admin_users,
             "department_breakdown": dept_breakdown,
             "level_breakdown": level_breakdown
-        })
+        }
+        cache_set(USER_STATS_CACHE_KEY, stats, USER_STATS_CACHE_TTL)
+        
+        return ojson(stats)
         
     except CustomHTTPException:
         raise
@@ -1,6 +1,6 @@
 from .user import UserCreate, UserUpdate, UserResponse, UserLogin
 from .attendance import AttendanceCreate, ClassCreate, ClassResponse, ClassAttendance, AttendanceUpdate, AttendanceStats, AttendanceReport, QRCodeGenerate, QRCodeScan, QRCodeValidation
-from .cafeteria import FoodItemCreate, FoodItemUpdate, FoodItem, MenuDayCreate, MenuDayUpdate, MenuDay, CafeteriaQRCode, QRCodeScanRequest, QRCodeScanResponse, CafeteriaStats
+from .cafeteria import FoodItemCreate, FoodItemUpdate, FoodItem, MenuDayCreate, MenuDayUpdate, MenuDay, CafeteriaQRCode, QRCodeScanRequest, QRScanUserInfo, QRCodeScanResponse, CafeteriaStats
 from .schedule import ScheduleCreate, ScheduleUpdate, ClassSchedule, StudentSchedule, ScheduleConflict, ScheduleStats, TodaySchedule, NextClass
 from .chat import ChatRoomCreate, ChatRoomUpdate, ChatRoom, ChatMessage, MessageCreate, MessageUpdate, MessageDelete, ChatStats, RoomMember, DirectMessage
 from .maps import LocationCreate, LocationResponse, LocationUpdate, DirectionsRequest, DirectionsResponse, NearbyRequest, NearbyResponse, CampusInfoResponse
@@ -8,7 +8,7 @@ from .maps import LocationCreate, LocationResponse, LocationUpdate, DirectionsRe
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin",
     "AttendanceCreate", "ClassCreate", "ClassResponse", "ClassAttendance", "AttendanceUpdate", "AttendanceStats", "AttendanceReport", "QRCodeGenerate", "QRCodeScan", "QRCodeValidation",
-    "FoodItemCreate", "FoodItemUpdate", "FoodItem", "MenuDayCreate", "MenuDayUpdate", "MenuDay", "CafeteriaQRCode", "QRCodeScanRequest", "QRCodeScanResponse", "CafeteriaStats",
+    "FoodItemCreate", "FoodItemUpdate", "FoodItem", "MenuDayCreate", "MenuDayUpdate", "MenuDay", "CafeteriaQRCode", "QRCodeScanRequest", "QRScanUserInfo", "QRCodeScanResponse", "CafeteriaStats",
     "ScheduleCreate", "ScheduleUpdate", "ClassSchedule", "StudentSchedule", "ScheduleConflict", "ScheduleStats", "TodaySchedule", "NextClass",
     "ChatRoomCreate", "ChatRoomUpdate", "ChatRoom", "ChatMessage", "MessageCreate", "MessageUpdate", "MessageDelete", "ChatStats", "RoomMember", "DirectMessage",
     "LocationCreate", "LocationResponse", "LocationUpdate", "DirectionsRequest", "DirectionsResponse", "NearbyRequest", "NearbyResponse", "CampusInfoResponse"
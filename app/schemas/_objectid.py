@@ -0,0 +1,31 @@
+"""
+Shared ObjectId field type for all schema modules
+Defined once so every model reuses the same core schema
+"""
+import re
+
+from bson import ObjectId
+from pydantic_core import core_schema
+
+# A string ObjectId is exactly 24 hex digits; ObjectId instances stringify to one
+_OID_MATCH = re.compile(r'[0-9a-fA-F]{24}').fullmatch
+
+class PyObjectId(str):
+    _CORE_SCHEMA = None
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        return cls._CORE_SCHEMA
+
+    @classmethod
+    def validate(cls, v):
+        s = v if isinstance(v, str) else str(v)
+        if not _OID_MATCH(s):
+            raise ValueError("Invalid ObjectId")
+        return s
+
+# Built once; accepts raw ObjectIds as read from Mongo as well as strings
+PyObjectId._CORE_SCHEMA = core_schema.no_info_after_validator_function(
+    PyObjectId.validate,
+    core_schema.union_schema([core_schema.is_instance_schema(ObjectId), core_schema.str_schema()])
+)
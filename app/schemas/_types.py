@@ -0,0 +1,20 @@
+"""
+Shared constrained field types for the schema modules
+Kept here rather than in core.validators so the Flask routers do not import pydantic
+"""
+from typing import Annotated
+
+from pydantic import AfterValidator, Field
+
+from ..core.validators import validate_student_id
+
+def _check_student_id(value: str) -> str:
+    """Reject student IDs that are not BU followed by 7 digits"""
+    if not validate_student_id(value):
+        raise ValueError('Invalid student ID format. Expected: BU followed by 7 digits (e.g., BU2024001)')
+    return value
+
+# Reusable constrained field types, so each constraint is declared once
+StudentId = Annotated[str, AfterValidator(_check_student_id)]
+Latitude = Annotated[float, Field(ge=-90, le=90)]
+Longitude = Annotated[float, Field(ge=-180, le=180)]
@@ -1,19 +1,8 @@
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Annotated, List
 from datetime import datetime, time
-from bson import ObjectId
 from enum import Enum
-
-class PyObjectId(str):
-    @classmethod
-    def __get_pydantic_core_schema__(cls, source_type, handler):
-        return handler(str)
-
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return str(v)
+from ._objectid import PyObjectId
 
 class AttendanceStatus(str, Enum):
     PRESENT = "present"
@@ -41,7 +30,7 @@ class ClassCreate(BaseModel):
         return v
 
 class ClassResponse(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     name: str
     course_code: str
     instructor_id: str
@@ -59,7 +48,7 @@ class ClassResponse(BaseModel):
     updated_at: datetime
 
 class ClassAttendance(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     user_id: str
     student_id: str
     full_name: str
@@ -76,8 +65,8 @@ class ClassAttendance(BaseModel):
     qr_code: str
     location: Optional[str] = None
     notes: Optional[str] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
 
 class AttendanceCreate(BaseModel):
     class_id: str
@@ -1,62 +1,41 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Annotated, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, Annotated, List, Tuple, Literal, get_args, Any
 from datetime import datetime, time
-from bson import ObjectId
-from enum import Enum
+from ._objectid import PyObjectId
 
-class PyObjectId(str):
-    @classmethod
-    def __get_pydantic_core_schema__(cls, source_type, handler):
-        return handler(str)
+MealType = Literal["breakfast", "lunch", "dinner", "snack"]
+MEAL_TYPES = get_args(MealType)
 
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return str(v)
-
-class MealType(str, Enum):
-    BREAKFAST = "breakfast"
-    LUNCH = "lunch"
-    DINNER = "dinner"
-    SNACK = "snack"
-
-class FoodCategory(str, Enum):
-    MAIN_COURSE = "main_course"
-    SIDE_DISH = "side_dish"
-    SALAD = "salad"
-    SOUP = "soup"
-    DESSERT = "dessert"
-    BEVERAGE = "beverage"
-    FRUIT = "fruit"
+FoodCategory = Literal["main_course", "side_dish", "salad", "soup", "dessert", "beverage", "fruit"]
+FOOD_CATEGORIES = get_args(FoodCategory)
 
 class FoodItem(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     name: str
     description: str
     category: FoodCategory
     price: float
     calories: Optional[int] = None
-    allergens: List[str] = []
+    allergens: Tuple[str, ...] = ()
     is_vegetarian: bool = False
     is_vegan: bool = False
     is_gluten_free: bool = False
     image_url: Optional[str] = None
     is_available: bool = True
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
 
 class MenuDay(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     date: datetime
     meal_type: MealType
-    food_items: List[str]  # List of food item IDs
+    food_items: Tuple[PyObjectId, ...]  # Food item IDs
     is_active: bool = True
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
 class CafeteriaQRCode(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     user_id: str
     student_id: str
     full_name: str
@@ -72,23 +51,35 @@ class CafeteriaQRCode(BaseModel):
     expires_at: Optional[datetime] = None
 
 class QRCodeScanRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     qr_code: str
     meal_type: MealType
     admin_id: str
 
+class QRScanUserInfo(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
+    student_id: str
+    full_name: str
+    department: str
+    level: str
+
 class QRCodeScanResponse(BaseModel):
     success: bool
     message: str
-    user_info: Optional[dict] = None
+    user_info: Optional[QRScanUserInfo] = None
     meal_type: Optional[MealType] = None
     timestamp: Optional[datetime] = None
 
 class CafeteriaStats(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     total_meals_served: int
     meals_by_type: dict
     popular_food_items: List[dict]
     daily_attendance: List[dict]
-    revenue_stats: Optional[dict] = None
+    revenue_stats: Any = None
 
 class FoodItemCreate(BaseModel):
     name: str
@@ -96,7 +87,7 @@ class FoodItemCreate(BaseModel):
     category: FoodCategory
     price: float
     calories: Optional[int] = None
-    allergens: List[str] = []
+    allergens: Tuple[str, ...] = ()
     is_vegetarian: bool = False
     is_vegan: bool = False
     is_gluten_free: bool = False
@@ -1,49 +1,29 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Annotated, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, Annotated, List, Tuple, Literal, get_args, Any
 from datetime import datetime
-from bson import ObjectId
-from enum import Enum
+from ._objectid import PyObjectId
 
-class PyObjectId(str):
-    @classmethod
-    def __get_pydantic_core_schema__(cls, source_type, handler):
-        return handler(str)
+ChatRoomType = Literal["direct", "group", "department", "course", "announcement"]
+CHAT_ROOM_TYPES = get_args(ChatRoomType)
 
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return str(v)
-
-class ChatRoomType(str, Enum):
-    DIRECT = "direct"
-    GROUP = "group"
-    DEPARTMENT = "department"
-    COURSE = "course"
-    ANNOUNCEMENT = "announcement"
-
-class MessageType(str, Enum):
-    TEXT = "text"
-    IMAGE = "image"
-    FILE = "file"
-    LOCATION = "location"
-    SYSTEM = "system"
+MessageType = Literal["text", "image", "file", "location", "system"]
+MESSAGE_TYPES = get_args(MessageType)
 
 class ChatRoom(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     name: str
     description: Optional[str] = None
     room_type: ChatRoomType
     created_by: str
-    members: List[str]  # List of user IDs
-    admins: List[str]  # List of admin user IDs
+    members: Tuple[PyObjectId, ...]  # User IDs
+    admins: Tuple[PyObjectId, ...]  # Admin user IDs
     is_active: bool = True
     is_private: bool = False
     max_members: Optional[int] = None
     avatar_url: Optional[str] = None
-    last_message: Optional[dict] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    last_message: Any = None
+    created_at: datetime
+    updated_at: datetime
 
 class ChatRoomCreate(BaseModel):
     name: str
@@ -66,30 +46,30 @@ class ChatRoomUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 class ChatMessage(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     room_id: str
     sender_id: str
     sender_name: str
     sender_avatar: Optional[str] = None
-    message_type: MessageType = MessageType.TEXT
+    message_type: MessageType = "text"
     content: str
     file_url: Optional[str] = None
     file_name: Optional[str] = None
     file_size: Optional[int] = None
-    location: Optional[dict] = None
+    location: Any = None
     reply_to: Optional[str] = None
     is_edited: bool = False
     edited_at: Optional[datetime] = None
     is_deleted: bool = False
     deleted_at: Optional[datetime] = None
-    read_by: List[str] = []  # List of user IDs who read the message
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
+    read_by: Tuple[PyObjectId, ...] = ()  # User IDs who read the message
+    created_at: datetime
+    updated_at: datetime
 
 class MessageCreate(BaseModel):
     room_id: str
     content: str
-    message_type: MessageType = MessageType.TEXT
+    message_type: MessageType = "text"
     file_url: Optional[str] = None
     file_name: Optional[str] = None
     file_size: Optional[int] = None
@@ -104,6 +84,8 @@ class MessageDelete(BaseModel):
     is_deleted: bool = True
 
 class ChatStats(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     total_rooms: int
     total_messages: int
     active_rooms: int
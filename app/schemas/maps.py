@@ -1,65 +1,65 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Annotated, List, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, Annotated, List, Tuple, Dict, Any, Literal, get_args
 from datetime import datetime
-from bson import ObjectId
-from enum import Enum
-
-class PyObjectId(str):
-    @classmethod
-    def __get_pydantic_core_schema__(cls, source_type, handler):
-        return handler(str)
-
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return str(v)
-
-class LocationCategory(str, Enum):
-    ACADEMIC = "academic"
-    ADMINISTRATIVE = "administrative"
-    RECREATIONAL = "recreational"
-    RESIDENTIAL = "residential"
-    DINING = "dining"
-    TRANSPORTATION = "transportation"
-    HEALTH = "health"
-    SECURITY = "security"
-    PARKING = "parking"
-    LIBRARY = "library"
-    SPORTS = "sports"
+from ._types import Latitude, Longitude
+from ._objectid import PyObjectId
+
+# Location field constraints, shared by create and update
+ShortName = Annotated[str, Field(min_length=1, max_length=100)]
+Description = Annotated[str, Field(min_length=1, max_length=500)]
+Address = Annotated[str, Field(min_length=1, max_length=200)]
+Code = Annotated[str, Field(max_length=20)]
+ShortText = Annotated[str, Field(max_length=100)]
+Url = Annotated[str, Field(max_length=255)]
+Floor = Annotated[int, Field(ge=0, le=100)]
+
+LocationCategory = Literal[
+    "academic",
+    "administrative",
+    "recreational",
+    "residential",
+    "dining",
+    "transportation",
+    "health",
+    "security",
+    "parking",
+    "library",
+    "sports"
+]
+LOCATION_CATEGORIES = get_args(LocationCategory)
 
 class LocationCreate(BaseModel):
-    name: str = Field(..., min_length=1, max_length=100)
-    description: str = Field(..., min_length=1, max_length=500)
+    name: ShortName
+    description: Description
     category: LocationCategory
-    latitude: float = Field(..., ge=-90, le=90)
-    longitude: float = Field(..., ge=-180, le=180)
-    address: str = Field(..., min_length=1, max_length=200)
-    building_code: Optional[str] = Field(None, max_length=20)
-    floor: Optional[int] = Field(None, ge=0, le=100)
-    room_number: Optional[str] = Field(None, max_length=20)
-    opening_hours: Optional[str] = Field(None, max_length=100)
-    contact_info: Optional[str] = Field(None, max_length=100)
-    image_url: Optional[str] = Field(None, max_length=255)
-    tags: Optional[List[str]] = Field(default_factory=list)
+    latitude: Latitude
+    longitude: Longitude
+    address: Address
+    building_code: Optional[Code] = None
+    floor: Optional[Floor] = None
+    room_number: Optional[Code] = None
+    opening_hours: Optional[ShortText] = None
+    contact_info: Optional[ShortText] = None
+    image_url: Optional[Url] = None
+    tags: Optional[Tuple[str, ...]] = ()
 
 class LocationUpdate(BaseModel):
-    name: Optional[str] = Field(None, min_length=1, max_length=100)
-    description: Optional[str] = Field(None, min_length=1, max_length=500)
+    name: Optional[ShortName] = None
+    description: Optional[Description] = None
     category: Optional[LocationCategory] = None
-    latitude: Optional[float] = Field(None, ge=-90, le=90)
-    longitude: Optional[float] = Field(None, ge=-180, le=180)
-    address: Optional[str] = Field(None, min_length=1, max_length=200)
-    building_code: Optional[str] = Field(None, max_length=20)
-    floor: Optional[int] = Field(None, ge=0, le=100)
-    room_number: Optional[str] = Field(None, max_length=20)
-    opening_hours: Optional[str] = Field(None, max_length=100)
-    contact_info: Optional[str] = Field(None, max_length=100)
-    image_url: Optional[str] = Field(None, max_length=255)
+    latitude: Optional[Latitude] = None
+    longitude: Optional[Longitude] = None
+    address: Optional[Address] = None
+    building_code: Optional[Code] = None
+    floor: Optional[Floor] = None
+    room_number: Optional[Code] = None
+    opening_hours: Optional[ShortText] = None
+    contact_info: Optional[ShortText] = None
+    image_url: Optional[Url] = None
     tags: Optional[List[str]] = None
 
 class LocationResponse(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     name: str
     description: str
     category: LocationCategory
@@ -72,24 +72,25 @@ class LocationResponse(BaseModel):
     opening_hours: Optional[str] = None
     contact_info: Optional[str] = None
     image_url: Optional[str] = None
-    tags: List[str] = []
+    tags: Tuple[str, ...] = ()
     is_active: bool = True
     visit_count: int = 0
     rating: float = 0.0
     total_ratings: int = 0
     created_at: datetime
-    updated_at: Optional[datetime] = None
+    updated_at: datetime
     created_by: PyObjectId
 
     class Config:
         populate_by_name = True
-        json_encoders = {ObjectId: str}
 
 class DirectionsRequest(BaseModel):
-    origin_lat: float = Field(..., ge=-90, le=90)
-    origin_lng: float = Field(..., ge=-180, le=180)
-    dest_lat: float = Field(..., ge=-90, le=90)
-    dest_lng: float = Field(..., ge=-180, le=180)
+    model_config = ConfigDict(defer_build=True)
+    
+    origin_lat: Latitude
+    origin_lng: Longitude
+    dest_lat: Latitude
+    dest_lng: Longitude
     mode: str = Field("walking", pattern="^(walking|driving|bicycling|transit)$")
 
 class DirectionsResponse(BaseModel):
@@ -98,44 +99,48 @@ class DirectionsResponse(BaseModel):
     distance: float
     duration: int
     mode: str
-    steps: List[Dict[str, Any]]
+    steps: List[Any]
 
 class NearbyRequest(BaseModel):
-    latitude: float = Field(..., ge=-90, le=90)
-    longitude: float = Field(..., ge=-180, le=180)
+    latitude: Latitude
+    longitude: Longitude
     radius: float = Field(1000, ge=100, le=10000)
     category: Optional[LocationCategory] = None
     limit: int = Field(20, ge=1, le=50)
 
 class NearbyResponse(BaseModel):
-    locations: List[Dict[str, Any]]
+    locations: List[Any]
     center_lat: float
     center_lng: float
     radius: float
     total_found: int
 
 class CampusInfoResponse(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     total_locations: int
     category_stats: List[Dict[str, Any]]
     most_visited_locations: List[Dict[str, Any]]
     last_updated: datetime
 
 # Legacy schemas for backward compatibility
-class LocationType(str, Enum):
-    ACADEMIC = "academic"
-    ADMINISTRATIVE = "administrative"
-    RECREATIONAL = "recreational"
-    RESIDENTIAL = "residential"
-    DINING = "dining"
-    TRANSPORTATION = "transportation"
-    HEALTH = "health"
-    SECURITY = "security"
-    PARKING = "parking"
-    LIBRARY = "library"
-    SPORTS = "sports"
+LocationType = Literal[
+    "academic",
+    "administrative",
+    "recreational",
+    "residential",
+    "dining",
+    "transportation",
+    "health",
+    "security",
+    "parking",
+    "library",
+    "sports"
+]
+LOCATION_TYPES = get_args(LocationType)
 
 class CampusLocation(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     name: str
     description: str
     location_type: LocationType
@@ -153,6 +158,8 @@ class CampusLocation(BaseModel):
     updated_at: Optional[datetime] = None
 
 class NavigationRequest(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     start_latitude: float
     start_longitude: float
     end_latitude: float
@@ -169,6 +176,8 @@ class NavigationResponse(BaseModel):
     warnings: List[str]
 
 class NearbySearch(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     latitude: float
     longitude: float
     radius: float = 1000  # meters
@@ -176,6 +185,8 @@ class NearbySearch(BaseModel):
     limit: int = 20
 
 class LocationStats(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     total_locations: int
     locations_by_type: dict
     popular_locations: List[dict]
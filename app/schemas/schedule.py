@@ -1,38 +1,16 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional, Annotated, List
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, Annotated, List, Tuple, Literal, get_args
 from datetime import datetime, time, date
-from bson import ObjectId
-from enum import Enum
+from ._objectid import PyObjectId
 
-class PyObjectId(str):
-    @classmethod
-    def __get_pydantic_core_schema__(cls, source_type, handler):
-        return handler(str)
+DayOfWeek = Literal["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+DAYS_OF_WEEK = get_args(DayOfWeek)
 
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return str(v)
-
-class DayOfWeek(str, Enum):
-    MONDAY = "monday"
-    TUESDAY = "tuesday"
-    WEDNESDAY = "wednesday"
-    THURSDAY = "thursday"
-    FRIDAY = "friday"
-    SATURDAY = "saturday"
-    SUNDAY = "sunday"
-
-class ScheduleType(str, Enum):
-    REGULAR = "regular"
-    EXAM = "exam"
-    HOLIDAY = "holiday"
-    SPECIAL = "special"
-    MAKEUP = "makeup"
+ScheduleType = Literal["regular", "exam", "holiday", "special", "makeup"]
+SCHEDULE_TYPES = get_args(ScheduleType)
 
 class ClassSchedule(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     course_code: str
     course_title: str
     instructor_id: str
@@ -44,7 +22,7 @@ class ClassSchedule(BaseModel):
     day_of_week: DayOfWeek
     start_time: time
     end_time: time
-    schedule_type: ScheduleType = ScheduleType.REGULAR
+    schedule_type: ScheduleType = "regular"
     is_active: bool = True
     max_students: Optional[int] = None
     current_enrollment: int = 0
@@ -63,7 +41,7 @@ class ScheduleCreate(BaseModel):
     day_of_week: DayOfWeek
     start_time: time
     end_time: time
-    schedule_type: ScheduleType = ScheduleType.REGULAR
+    schedule_type: ScheduleType = "regular"
     max_students: Optional[int] = None
     description: Optional[str] = None
 
@@ -81,20 +59,22 @@ class ScheduleUpdate(BaseModel):
     description: Optional[str] = None
 
 class StudentSchedule(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     student_id: str
     student_name: str
     department: str
     level: str
     semester: str
     academic_year: str
-    courses: List[str]  # List of course IDs
+    courses: Tuple[PyObjectId, ...]  # Course IDs
     total_credit_hours: int
     is_active: bool = True
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
 class ScheduleConflict(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+    
     course_id: str
     course_code: str
     conflict_type: str
@@ -1,9 +1,10 @@
-from pydantic import BaseModel, Field, field_validator, EmailStr
+from pydantic import BaseModel, ConfigDict, Field, field_validator, EmailStr
 from typing import Optional, Annotated, List
 from datetime import datetime
-from bson import ObjectId
 from enum import Enum
-from ..core.validators import validate_student_id, validate_phone_number
+from ..core.validators import validate_phone_number
+from ._types import StudentId
+from ._objectid import PyObjectId
 
 class UserRole(str, Enum):
     STUDENT = "student"
@@ -17,19 +18,8 @@ class UserStatus(str, Enum):
     SUSPENDED = "suspended"
     GRADUATED = "graduated"
 
-class PyObjectId(str):
-    @classmethod
-    def __get_pydantic_core_schema__(cls, source_type, handler):
-        return handler(str)
-
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
-        return str(v)
-
 class UserBase(BaseModel):
-    student_id: str
+    student_id: StudentId
     email: EmailStr
     full_name: str
     department: str
@@ -38,13 +28,6 @@ class UserBase(BaseModel):
     role: UserRole = UserRole.STUDENT
     status: UserStatus = UserStatus.ACTIVE
     
-    @field_validator('student_id')
-    @classmethod
-    def validate_student_id_format(cls, v):
-        if not validate_student_id(v):
-            raise ValueError('Invalid student ID format. Expected: BU followed by 7 digits (e.g., BU2024001)')
-        return v
-    
     @field_validator('phone_number')
     @classmethod
     def validate_phone_format(cls, v):
@@ -63,6 +46,8 @@ class UserCreate(UserBase):
         return v
 
 class UserUpdate(BaseModel):
+    model_config = ConfigDict(extra='forbid')
+    
     full_name: Optional[str] = None
     department: Optional[str] = None
     level: Optional[str] = None
@@ -83,7 +68,7 @@ class UserLogin(BaseModel):
     password: str
 
 class UserResponse(UserBase):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     profile_picture: Optional[str] = None
     is_active: bool
     is_verified: bool
@@ -93,10 +78,6 @@ class UserResponse(UserBase):
     
     class Config:
         from_attributes = True
-        json_encoders = {
-            ObjectId: str,
-            datetime: lambda v: v.isoformat() if v else None
-        }
         populate_by_name = True
 
 class Token(BaseModel):
@@ -128,7 +109,7 @@ class AdminUpdate(BaseModel):
 
 # Permission schemas
 class Permission(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     name: str
     description: str
     resource: str
@@ -136,7 +117,7 @@ class Permission(BaseModel):
     created_at: Optional[datetime] = None
 
 class Role(BaseModel):
-    id: Annotated[PyObjectId, Field(default_factory=PyObjectId, alias="_id")]
+    id: Annotated[PyObjectId, Field(alias="_id")]
     name: str
     description: str
     permissions: List[str]
@@ -3,10 +3,6 @@
 Script to create a test user in the database
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from app.database import SessionLocal
 from app.models.user import User
 from app.core.security import get_password_hash
@@ -3,10 +3,6 @@
 Script to create a test user in MongoDB for Flask backend
 """
 
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
 from app.database import connect_to_mongo, get_database
 from werkzeug.security import generate_password_hash
 from datetime import datetime
@@ -35,6 +31,7 @@ def create_test_user():
             "student_id": "BU2024001",
             "email": "test@babcock.edu",
             "full_name": "Test Student",
+            "full_name_lc": "test student",
             "password_hash": generate_password_hash("test123"),
             "department": "Computer Science",
             "level": "300",
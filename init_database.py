@@ -3,205 +3,147 @@
 Script to initialize MongoDB database with collections and indexes
 """
 
-import asyncio
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.database import connect_to_mongo, close_mongo_connection, ensure_indexes, get_database
 from app.core.config import settings
 from app.core.security import get_password_hash
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pymongo import UpdateOne
 
-async def init_database():
+def init_database():
     """Initialize the MongoDB database with collections and sample data"""
     
     print("🔧 Initializing Smart Campus Database...")
     
-    # Connect to MongoDB
-    await connect_to_mongo()
+    # Connecting also backfills derived fields and creates the indexes in app.database.INDEXES
+    print("📊 Creating collections and indexes...")
+    if not connect_to_mongo():
+        raise ConnectionError("Failed to connect to MongoDB")
     db = get_database()
+    now = datetime.utcnow()
     
     try:
-        # Create collections and indexes
-        print("📊 Creating collections and indexes...")
-        
-        # Users collection
-        await db.users.create_index("email", unique=True)
-        await db.users.create_index("student_id", unique=True)
-        print("✅ Users collection indexed")
-        
-        # Attendance collection
-        await db.attendance.create_index([("user_id", 1), ("class_id", 1), ("date", 1)], unique=True)
-        await db.attendance.create_index("qr_code", unique=True)
-        print("✅ Attendance collection indexed")
-        
-        # Classes collection
-        await db.classes.create_index("course_code", unique=True)
-        await db.classes.create_index([("department", 1), ("level", 1)])
-        print("✅ Classes collection indexed")
-        
-        # Cafeteria collection
-        await db.cafeterias.create_index("name", unique=True)
-        print("✅ Cafeterias collection indexed")
-        
-        # Menu items collection
-        await db.menu_items.create_index([("cafeteria_id", 1), ("category", 1)])
-        await db.menu_items.create_index("name")
-        print("✅ Menu items collection indexed")
-        
-        # Schedule collection
-        await db.schedules.create_index([("user_id", 1), ("day_of_week", 1), ("start_time", 1)])
-        print("✅ Schedules collection indexed")
-        
-        # Chat rooms collection
-        await db.chat_rooms.create_index("name", unique=True)
-        print("✅ Chat rooms collection indexed")
-        
-        # Chat messages collection
-        await db.chat_messages.create_index([("room_id", 1), ("created_at", -1)])
-        await db.chat_messages.create_index("sender_id")
-        print("✅ Chat messages collection indexed")
-        
-        # Locations collection
-        await db.locations.create_index([("latitude", 1), ("longitude", 1)])
-        await db.locations.create_index("category")
-        print("✅ Locations collection indexed")
+        # connect() only logs index failures; the init script should stop on them
+        if not ensure_indexes():
+            raise RuntimeError("Index creation failed, see the warnings above")
+        print("✅ All indexes created")
         
         # Create sample data
         print("📝 Creating sample data...")
         
-        # Sample test user
-        test_user = {
-            "student_id": "BU2024001",
-            "email": "test@babcock.edu",
-            "full_name": "Test Student",
-            "password_hash": get_password_hash("test123"),
-            "department": "Computer Science",
-            "level": "300",
-            "phone_number": "+2348012345678",
-            "is_active": True,
-            "is_verified": True,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        # Check if test user exists
-        existing_user = await db.users.find_one({"email": "test@babcock.edu"})
+        # Sample test user; only hash the password when the user is actually created
+        existing_user = db.users.find_one({"email": "test@babcock.edu"}, {"_id": 1})
         if not existing_user:
-            await db.users.insert_one(test_user)
+            test_user = {
+                "student_id": "BU2024001",
+                "email": "test@babcock.edu",
+                "full_name": "Test Student",
+                "full_name_lc": "test student",
+                "password_hash": get_password_hash("test123"),
+                "department": "Computer Science",
+                "level": "300",
+                "phone_number": "+2348012345678",
+                "is_active": True,
+                "is_verified": True,
+                "created_at": now,
+                "updated_at": now
+            }
+            db.users.insert_one(test_user)
             print("✅ Test user created")
         else:
             print("ℹ️ Test user already exists")
         
-        # Sample cafeterias
+        # Sample cafeterias: (name, location, description, opening hours)
         cafeterias = [
             {
-                "name": "Main Cafeteria",
-                "location": "Main Campus",
-                "description": "Main student cafeteria",
+                "name": name,
+                "location": location,
+                "description": description,
                 "is_open": True,
-                "opening_hours": "7:00 AM - 9:00 PM",
-                "created_at": datetime.utcnow()
-            },
+                "opening_hours": hours,
+                "created_at": now,
+                "updated_at": now
+            }
+            for name, location, description, hours in [
+                ("Main Cafeteria", "Main Campus", "Main student cafeteria", "7:00 AM - 9:00 PM"),
+                ("Faculty Cafeteria", "Faculty Building", "Faculty and staff cafeteria", "8:00 AM - 6:00 PM"),
+            ]
+        ]
+        
+        # Sample locations: (name, category, description, latitude, longitude)
+        locations = [
             {
-                "name": "Faculty Cafeteria",
-                "location": "Faculty Building",
-                "description": "Faculty and staff cafeteria",
-                "is_open": True,
-                "opening_hours": "8:00 AM - 6:00 PM",
-                "created_at": datetime.utcnow()
+                "name": name,
+                "category": category,
+                "description": description,
+                "latitude": lat,
+                "longitude": lng,
+                "location": {"type": "Point", "coordinates": [lng, lat]},
+                "is_active": True,
+                "created_at": now,
+                "updated_at": now
             }
+            for name, category, description, lat, lng in [
+                ("Main Library", "Academic", "Main university library", 6.5244, 3.3792),
+                ("Administrative Building", "Administrative", "Main administrative offices", 6.5245, 3.3793),
+                ("Student Center", "Recreational", "Student recreation center", 6.5243, 3.3791),
+            ]
         ]
         
-        for cafeteria in cafeterias:
-            existing = await db.cafeterias.find_one({"name": cafeteria["name"]})
-            if not existing:
-                await db.cafeterias.insert_one(cafeteria)
-                print(f"✅ Cafeteria '{cafeteria['name']}' created")
+        # Cafeterias and locations are independent; menu items wait for cafeteria ids
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            cafeteria_future = pool.submit(
+                db.cafeterias.bulk_write,
+                [UpdateOne({"name": c["name"]}, {"$setOnInsert": c}, upsert=True) for c in cafeterias],
+                ordered=False
+            )
+            location_future = pool.submit(
+                db.locations.bulk_write,
+                [UpdateOne({"name": loc["name"]}, {"$setOnInsert": loc}, upsert=True) for loc in locations],
+                ordered=False
+            )
+            cafeteria_result, location_result = cafeteria_future.result(), location_future.result()
+        print(f"✅ Cafeterias: {cafeteria_result.upserted_count} created")
+        print(f"✅ Locations: {location_result.upserted_count} created")
+        
+        # Menu items reference their cafeteria by _id, not by name
+        cafeteria_ids = {
+            doc["name"]: doc["_id"]
+            for doc in db.cafeterias.find(
+                {"name": {"$in": [c["name"] for c in cafeterias]}}, {"name": 1}
+            )
+        }
         
-        # Sample menu items
+        # Sample menu items: (name, description, price, vegetarian)
+        main_cafeteria_id = cafeteria_ids["Main Cafeteria"]
         menu_items = [
             {
-                "cafeteria_id": "Main Cafeteria",
-                "name": "Jollof Rice",
-                "description": "Traditional Nigerian jollof rice",
-                "price": 500,
-                "category": "Lunch",
-                "is_vegetarian": False,
-                "is_halal": True,
-                "is_available": True,
-                "created_at": datetime.utcnow()
-            },
-            {
-                "cafeteria_id": "Main Cafeteria",
-                "name": "Fried Rice",
-                "description": "Chinese-style fried rice",
-                "price": 450,
+                "cafeteria_id": main_cafeteria_id,
+                "name": name,
+                "description": description,
+                "price": price,
                 "category": "Lunch",
-                "is_vegetarian": False,
+                "is_vegetarian": is_vegetarian,
                 "is_halal": True,
                 "is_available": True,
-                "created_at": datetime.utcnow()
-            },
-            {
-                "cafeteria_id": "Main Cafeteria",
-                "name": "Vegetable Salad",
-                "description": "Fresh vegetable salad",
-                "price": 300,
-                "category": "Lunch",
-                "is_vegetarian": True,
-                "is_halal": True,
-                "is_available": True,
-                "created_at": datetime.utcnow()
-            }
-        ]
-        
-        for item in menu_items:
-            existing = await db.menu_items.find_one({
-                "cafeteria_id": item["cafeteria_id"],
-                "name": item["name"]
-            })
-            if not existing:
-                await db.menu_items.insert_one(item)
-                print(f"✅ Menu item '{item['name']}' created")
-        
-        # Sample locations
-        locations = [
-            {
-                "name": "Main Library",
-                "category": "Academic",
-                "description": "Main university library",
-                "latitude": 6.5244,
-                "longitude": 3.3792,
-                "is_active": True,
-                "created_at": datetime.utcnow()
-            },
-            {
-                "name": "Administrative Building",
-                "category": "Administrative",
-                "description": "Main administrative offices",
-                "latitude": 6.5245,
-                "longitude": 3.3793,
-                "is_active": True,
-                "created_at": datetime.utcnow()
-            },
-            {
-                "name": "Student Center",
-                "category": "Recreational",
-                "description": "Student recreation center",
-                "latitude": 6.5243,
-                "longitude": 3.3791,
-                "is_active": True,
-                "created_at": datetime.utcnow()
+                "created_at": now,
+                "updated_at": now
             }
+            for name, description, price, is_vegetarian in [
+                ("Jollof Rice", "Traditional Nigerian jollof rice", 500, False),
+                ("Fried Rice", "Chinese-style fried rice", 450, False),
+                ("Vegetable Salad", "Fresh vegetable salad", 300, True),
+            ]
         ]
         
-        for location in locations:
-            existing = await db.locations.find_one({"name": location["name"]})
-            if not existing:
-                await db.locations.insert_one(location)
-                print(f"✅ Location '{location['name']}' created")
+        result = db.menu_items.bulk_write(
+            [
+                UpdateOne({"cafeteria_id": i["cafeteria_id"], "name": i["name"]}, {"$setOnInsert": i}, upsert=True)
+                for i in menu_items
+            ],
+            ordered=False
+        )
+        print(f"✅ Menu items: {result.upserted_count} created")
         
         print("\n🎉 Database initialization completed successfully!")
         print("\n📋 Test Credentials:")
@@ -213,7 +155,7 @@ async def init_database():
         print(f"❌ Error initializing database: {e}")
         raise
     finally:
-        await close_mongo_connection()
+        close_mongo_connection()
 
 if __name__ == "__main__":
-    asyncio.run(init_database()) 
\ No newline at end of file
+    init_database() 
\ No newline at end of file
@@ -3,12 +3,28 @@
 Test FastAPI backend locally to verify it works
 """
 
-import asyncio
 import uvicorn
 from app.main import app
 from app.database import connect_to_mongo, close_mongo_connection
 
-async def test_backend():
+def collection_stats(collection):
+    """Read count, storageSize and totalIndexSize from $collStats"""
+    docs = list(collection.aggregate([{"$collStats": {"storageStats": {}}}]))
+    # Sharded collections report one document per shard
+    return {
+        field: sum(doc["storageStats"].get(field, 0) for doc in docs)
+        for field in ("count", "storageSize", "totalIndexSize")
+    }
+
+def format_stats(stats):
+    """Format collection stats for the report"""
+    return (
+        f"{stats['count']} documents, "
+        f"{stats['storageSize'] / 1024:.1f} KiB stored, "
+        f"{stats['totalIndexSize'] / 1024:.1f} KiB of indexes"
+    )
+
+def test_backend():
     """Test the backend locally"""
     print("🚀 Testing FastAPI Backend Locally")
     print("=" * 50)
@@ -16,20 +32,19 @@ async def test_backend():
     try:
         # Connect to MongoDB
         print("📡 Connecting to MongoDB...")
-        await connect_to_mongo()
+        if not connect_to_mongo():
+            raise ConnectionError("Failed to connect to MongoDB")
         print("✅ MongoDB connected successfully!")
         
         # Test database operations
         from app.database import get_database
         db = get_database()
         
-        # Test users collection
-        users_count = await db.users.count_documents({})
-        print(f"👥 Users in database: {users_count}")
-        
-        # Test attendance collection
-        attendance_count = await db.attendance.count_documents({})
-        print(f"📊 Attendance records: {attendance_count}")
+        # Count, data size and index size per collection, one $collStats each
+        users_stats = collection_stats(db.users)
+        attendance_stats = collection_stats(db.attendance)
+        print(f"👥 Users in database: {format_stats(users_stats)}")
+        print(f"📊 Attendance records: {format_stats(attendance_stats)}")
         
         print("\n✅ Backend is working correctly!")
         print("🌐 You can now test the API endpoints:")
@@ -43,7 +58,7 @@ async def test_backend():
         print(f"❌ Backend test failed: {type(e).__name__}: {e}")
         return False
     finally:
-        await close_mongo_connection()
+        close_mongo_connection()
 
 def run_backend():
     """Run the FastAPI backend locally"""
@@ -58,7 +73,7 @@ def run_backend():
 
 if __name__ == "__main__":
     # Test the backend first
-    success = asyncio.run(test_backend())
+    success = test_backend()
     
     if success:
         print("\n🎉 Backend test passed! Starting server...")
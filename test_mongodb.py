@@ -3,15 +3,12 @@
 Test script to verify MongoDB connection
 """
 
-import asyncio
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from datetime import datetime
 
 from app.database import connect_to_mongo, close_mongo_connection, get_database
 from app.core.config import settings
 
-async def test_mongodb_connection():
+def test_mongodb_connection():
     """Test MongoDB connection and basic operations"""
     
     print("🔍 Testing MongoDB Connection...")
@@ -20,7 +17,8 @@ async def test_mongodb_connection():
     
     try:
         # Connect to MongoDB
-        await connect_to_mongo()
+        if not connect_to_mongo():
+            raise ConnectionError("Failed to connect to MongoDB")
         db = get_database()
         
         print("✅ Successfully connected to MongoDB!")
@@ -28,24 +26,28 @@ async def test_mongodb_connection():
         # Test basic operations
         print("\n🧪 Testing basic operations...")
         
+        # Reap leftovers from aborted runs so the test collection stays small
+        db.test_collection.create_index("created_at", expireAfterSeconds=60)
+        
         # Test insert
         test_doc = {
             "test": "connection",
-            "timestamp": "2024-01-01"
+            "timestamp": "2024-01-01",
+            "created_at": datetime.utcnow()
         }
         
-        result = await db.test_collection.insert_one(test_doc)
+        result = db.test_collection.insert_one(test_doc)
         print(f"✅ Insert test: {result.inserted_id}")
         
         # Test find
-        found_doc = await db.test_collection.find_one({"test": "connection"})
+        found_doc = db.test_collection.find_one({"_id": result.inserted_id})
         if found_doc:
             print("✅ Find test: Document found")
         else:
             print("❌ Find test: Document not found")
         
         # Test delete
-        delete_result = await db.test_collection.delete_one({"test": "connection"})
+        delete_result = db.test_collection.delete_one({"_id": result.inserted_id})
         print(f"✅ Delete test: {delete_result.deleted_count} document deleted")
         
         print("\n🎉 All MongoDB tests passed!")
@@ -54,7 +56,7 @@ async def test_mongodb_connection():
         print(f"❌ MongoDB connection failed: {e}")
         raise
     finally:
-        await close_mongo_connection()
+        close_mongo_connection()
 
 if __name__ == "__main__":
-    asyncio.run(test_mongodb_connection()) 
\ No newline at end of file
+    test_mongodb_connection() 
\ No newline at end of file
@@ -3,36 +3,27 @@
 Simple test to check basic imports
 """
 
-print("Testing basic imports...")
+import importlib
+import sys
 
-try:
-    import fastapi
-    print(f"✅ FastAPI imported: {fastapi.__version__}")
-except Exception as e:
-    print(f"❌ FastAPI import failed: {e}")
+# (module, display name)
+MODULES = [
+    ("fastapi", "FastAPI"),
+    ("pydantic", "Pydantic"),
+    ("uvicorn", "Uvicorn"),
+    ("motor", "Motor"),
+    ("jwt", "PyJWT"),
+]
 
-try:
-    import pydantic
-    print(f"✅ Pydantic imported: {pydantic.__version__}")
-except Exception as e:
-    print(f"❌ Pydantic import failed: {e}")
+# Collect the report and write it in one go
+lines = ["Testing basic imports..."]
 
-try:
-    import uvicorn
-    print(f"✅ Uvicorn imported: {uvicorn.__version__}")
-except Exception as e:
-    print(f"❌ Uvicorn import failed: {e}")
+for module_name, display_name in MODULES:
+    try:
+        module = importlib.import_module(module_name)
+        lines.append(f"✅ {display_name} imported: {module.__version__}")
+    except Exception as e:
+        lines.append(f"❌ {display_name} import failed: {e}")
 
-try:
-    import motor
-    print(f"✅ Motor imported: {motor.__version__}")
-except Exception as e:
-    print(f"❌ Motor import failed: {e}")
-
-try:
-    import jwt
-    print(f"✅ PyJWT imported: {jwt.__version__}")
-except Exception as e:
-    print(f"❌ PyJWT import failed: {e}")
-
-print("Import test completed!")
+lines.append("Import test completed!")
+sys.stdout.write("\n".join(lines) + "\n")
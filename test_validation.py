@@ -4,8 +4,6 @@ Test script to verify custom validation functions work correctly
 """
 
 import sys
-import os
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 def test_validation():
     """Test the custom validation functions"""
@@ -13,7 +11,7 @@ def test_validation():
     print("🧪 Testing Custom Validation Functions...")
     
     try:
-        from app.core.validators import validate_email, validate_student_id, validate_phone_number
+        from app.core.validators import validate_email_many, validate_student_id_many, validate_phone_number_many
         
         # Test email validation
         test_emails = [
@@ -24,10 +22,11 @@ def test_validation():
             "@domain.com"             # Invalid
         ]
         
-        for email in test_emails:
-            is_valid = validate_email(email)
+        lines = []
+        for email, is_valid in zip(test_emails, validate_email_many(test_emails)):
             status = "✅" if is_valid else "❌"
-            print(f"{status} Email '{email}': {'Valid' if is_valid else 'Invalid'}")
+            lines.append(f"{status} Email '{email}': {'Valid' if is_valid else 'Invalid'}")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # Test student ID validation
         test_ids = [
@@ -39,10 +38,11 @@ def test_validation():
             "2024001"                 # Invalid (no prefix)
         ]
         
-        for student_id in test_ids:
-            is_valid = validate_student_id(student_id)
+        lines = []
+        for student_id, is_valid in zip(test_ids, validate_student_id_many(test_ids)):
             status = "✅" if is_valid else "❌"
-            print(f"{status} Student ID '{student_id}': {'Valid' if is_valid else 'Invalid'}")
+            lines.append(f"{status} Student ID '{student_id}': {'Valid' if is_valid else 'Invalid'}")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         # Test phone validation
         test_phones = [
@@ -55,10 +55,11 @@ def test_validation():
             ""                        # Valid (optional)
         ]
         
-        for phone in test_phones:
-            is_valid = validate_phone_number(phone)
+        lines = []
+        for phone, is_valid in zip(test_phones, validate_phone_number_many(test_phones)):
             status = "✅" if is_valid else "❌"
-            print(f"{status} Phone '{phone}': {'Valid' if is_valid else 'Invalid'}")
+            lines.append(f"{status} Phone '{phone}': {'Valid' if is_valid else 'Invalid'}")
+        sys.stdout.write("\n".join(lines) + "\n")
         
         print("\n🎉 Validation tests completed!")
         